@@ -1,6 +1,7 @@
 """CLI mode for batch processing with YAML config."""
 
 import logging
+import os
 from pathlib import Path
 
 import yaml
@@ -13,6 +14,7 @@ from src.models.generated import GoogleEarthTileGeneratorConfiguration
 from src.models.layer_composition import LayerComposition
 from src.models.outputs import KMZOutput
 from src.outputs import get_output_handler
+from src.utils.event_loop import close_event_loop
 from src.utils.kml_extent import calculate_extent_from_kml
 
 logger = logging.getLogger(__name__)
@@ -176,9 +178,11 @@ def run_cli(config_path: str) -> int:
         outputs = validated_config.outputs
 
         # Convert relative paths to absolute (resolve relative to config file)
+        # Output paths stay plain strings; handlers build a Path when generating
+        config_dir_str = os.fspath(config_dir)
         for output in outputs:
-            if not Path(output.path).is_absolute():
-                output.path = str(config_dir / output.path)
+            if not os.path.isabs(output.path):
+                output.path = os.path.join(config_dir_str, output.path)
 
         layer_specs = config["layers"]
 
@@ -209,26 +213,19 @@ def run_cli(config_path: str) -> int:
             logger.info(f"Single zoom level: {max_zoom}")
 
         # Parse layer specifications (support both string and dict formats)
-        layer_compositions = []
-        layers = []
-
-        for spec in layer_specs:
-            # Use LayerComposition.from_dict() to properly parse all fields
-            # including lod_mode, selected_zooms, opacity, blend_mode, etc.
-            composition = LayerComposition.from_dict(spec, layer_registry)
-            layer_compositions.append(composition)
-            layers.append(composition.layer_config)
+        # LayerComposition.from_dict_many() parses all fields
+        # including lod_mode, selected_zooms, opacity, blend_mode, etc.
+        layer_compositions = LayerComposition.from_dict_many(layer_specs, layer_registry)
+        layers = [composition.layer_config for composition in layer_compositions]
 
         # No zoom range clamping needed - resampling is supported
         # Users can specify any zoom range from 2-18, regardless of layer native zoom ranges
 
         # Calculate estimates across all zoom levels
-        total_tiles = 0
-        for zoom_level in range(min_zoom, max_zoom + 1):
-            tile_count = TileCalculator.estimate_tile_count(
-                extent.min_lon, extent.min_lat, extent.max_lon, extent.max_lat, zoom_level
-            )
-            total_tiles += tile_count * len(layers)
+        tile_counts = TileCalculator.estimate_tile_counts_range(
+            extent.min_lon, extent.min_lat, extent.max_lon, extent.max_lat, min_zoom, max_zoom
+        )
+        total_tiles = int(tile_counts.sum()) * len(layers)
 
         # Build layer names for display
         layer_names = [comp.layer_config.name for comp in layer_compositions]
@@ -291,3 +288,6 @@ def run_cli(config_path: str) -> int:
     except Exception as e:
         logger.exception(f"Unexpected error: {e}")
         return 1
+    finally:
+        # Release the loop and worker threads used for generation, as asyncio.run() did
+        close_event_loop()
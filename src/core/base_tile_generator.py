@@ -21,21 +21,31 @@ class BaseTileGenerator:
     multiple output formats (KMZ, MBTiles, GeoTIFF, PNG directory, etc.).
     """
 
-    def __init__(self, output_path: Path, progress_callback=None, enable_cache: bool = True):
+    def __init__(
+        self,
+        output_path: Path,
+        progress_callback=None,
+        enable_cache: bool = True,
+        compositor: TileCompositor | None = None,
+    ):
         """Initialize base tile generator.
 
         Args:
             output_path: Path for output file
             progress_callback: Optional callback(current, total, message) for progress updates
             enable_cache: Whether to use tile caching (default: True)
+            compositor: Optional compositor shared with other generators, so they reuse one
+                HTTP session. The caller owns it and is responsible for closing it.
         """
         self.output_path = Path(output_path)
         self.progress_callback = progress_callback
-        self.compositor = TileCompositor(enable_cache=enable_cache)
+        self._owns_compositor = compositor is None
+        self.compositor = compositor if compositor is not None else TileCompositor(enable_cache=enable_cache)
 
     async def close(self):
-        """Close compositor resources."""
-        await self.compositor.close()
+        """Close compositor resources, unless the compositor is shared."""
+        if self._owns_compositor:
+            await self.compositor.close()
 
     def calculate_total_tiles(
         self, extent: Extent, min_zoom: int, max_zoom: int, composited_count: int, separate_count: int
@@ -128,7 +138,8 @@ class BaseTileGenerator:
         temp_composition = layer_composition.copy()
         temp_composition.opacity = 100
 
-        for zoom_level in range(min_zoom, max_zoom + 1):
+        # Zooms beyond the layer's resample distance are skipped entirely
+        for zoom_level in layer_composition.iter_effective_zooms(min_zoom, max_zoom):
             logger.info(f"Fetching {layer_name} tiles at zoom {zoom_level}...")
 
             # Get tiles in extent
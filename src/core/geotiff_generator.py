@@ -1,6 +1,6 @@
 """GeoTIFF format generator."""
 
-import io
+import asyncio
 import logging
 import math
 from pathlib import Path
@@ -19,6 +19,10 @@ logger = logging.getLogger(__name__)
 # Enable GDAL exceptions for better error handling
 gdal.UseExceptions()
 
+# Version of the files this generator writes, recorded in output sidecars. Bump it
+# whenever the output bytes change for the same inputs so existing files are regenerated
+OUTPUT_FORMAT_VERSION = 1
+
 
 class GeoTIFFGenerator(BaseTileGenerator):
     """Generator for GeoTIFF format files.
@@ -143,6 +147,10 @@ class GeoTIFFGenerator(BaseTileGenerator):
         if compression != "none":
             options.append(f"COMPRESS={compression.upper()}")
 
+        # Horizontal differencing gives LZW/DEFLATE longer runs on 8-bit imagery (lossless)
+        if compression in ("lzw", "deflate"):
+            options.append("PREDICTOR=2")
+
         # BigTIFF support for large files
         options.append("BIGTIFF=IF_SAFER")
 
@@ -183,32 +191,28 @@ class GeoTIFFGenerator(BaseTileGenerator):
         return dataset
 
     def _write_tile_to_raster(
-        self, dataset: gdal.Dataset, tile_data: bytes, x_offset: int, y_offset: int, bands: int
+        self, dataset: gdal.Dataset, img: Image.Image, x_offset: int, y_offset: int, bands: int
     ) -> None:
         """Write a single tile to the raster dataset.
 
         Args:
             dataset: GDAL dataset
-            tile_data: PNG or JPEG tile data as bytes
+            img: Composited tile image (not modified)
             x_offset: Pixel X offset in raster
             y_offset: Pixel Y offset in raster
             bands: Number of bands in dataset (3 or 4)
         """
-        # Decode tile to numpy array
-        img = Image.open(io.BytesIO(tile_data))
-
-        # Convert to RGBA if needed
-        if img.mode != "RGBA":
-            img = img.convert("RGBA")
+        # Convert straight to the dataset's band layout: RGB (JPEG compression) or RGBA,
+        # so JPEG output never carries an alpha channel through to GDAL
+        mode = "RGB" if bands == 3 else "RGBA"
+        if img.mode != mode:
+            img = img.convert(mode)
 
-        # Convert to numpy array
-        tile_array = np.array(img)
+        # Convert to uint8 numpy array of shape (height, width, bands)
+        tile_array = np.asarray(img)
 
-        # Write each band
-        for band_idx in range(min(bands, 4)):  # Write up to bands available
-            band = dataset.GetRasterBand(band_idx + 1)  # GDAL bands are 1-indexed
-            band_data = tile_array[:, :, band_idx]
-            band.WriteArray(band_data, x_offset, y_offset)
+        # Write all bands in a single pixel-interleaved request rather than one per band
+        dataset.WriteArray(tile_array, x_offset, y_offset, interleave="pixel")
 
     def _build_pyramids(self, dataset: gdal.Dataset, min_zoom: int, max_zoom: int) -> None:
         """Build internal overviews (pyramids) for multi-zoom support.
@@ -283,20 +287,12 @@ class GeoTIFFGenerator(BaseTileGenerator):
         logger.info(f"Extent: {extent.min_lon:.6f},{extent.min_lat:.6f} to {extent.max_lon:.6f},{extent.max_lat:.6f}")
         logger.info(f"Zoom range: {min_zoom}-{max_zoom}, Compression: {compression}, Multi-zoom: {multi_zoom}")
 
-        # Calculate raster dimensions at max_zoom (base resolution)
-        tiles_at_max_zoom = TileCalculator.get_tiles_in_extent(
+        # Get tile bounds at max_zoom (base resolution). Tiles are streamed row by row
+        # from these bounds rather than materializing the full tile list.
+        min_tile_x, min_tile_y, max_tile_x, max_tile_y = TileCalculator.get_tile_range(
             extent.min_lon, extent.min_lat, extent.max_lon, extent.max_lat, max_zoom
         )
 
-        if not tiles_at_max_zoom:
-            raise ValueError("No tiles in extent at max zoom level")
-
-        # Get tile bounds
-        min_tile_x = min(x for x, _ in tiles_at_max_zoom)
-        max_tile_x = max(x for x, _ in tiles_at_max_zoom)
-        min_tile_y = min(y for _, y in tiles_at_max_zoom)
-        max_tile_y = max(y for _, y in tiles_at_max_zoom)
-
         # Calculate raster dimensions
         width_tiles = max_tile_x - min_tile_x + 1
         height_tiles = max_tile_y - min_tile_y + 1
@@ -329,35 +325,36 @@ class GeoTIFFGenerator(BaseTileGenerator):
             self._set_metadata(dataset, attribution)
 
             # Calculate total tiles for progress tracking
-            total_tiles = len(tiles_at_max_zoom)
+            total_tiles = width_tiles * height_tiles
 
-            # Fetch and write tiles
+            # Fetch and write tiles in row-major order
             logger.info(f"Fetching and writing {total_tiles} tiles...")
 
-            for processed, (x, y) in enumerate(sorted(tiles_at_max_zoom, key=lambda t: (t[1], t[0])), start=1):
+            tiles = ((x, y) for y in range(min_tile_y, max_tile_y + 1) for x in range(min_tile_x, max_tile_x + 1))
+            for processed, (x, y) in enumerate(tiles, start=1):
                 # Composite tile
-                tile_data = await self.compositor.composite_tile(x, y, max_zoom, layer_compositions)
+                tile_image = await self.compositor.composite_tile_image(x, y, max_zoom, layer_compositions)
 
-                if tile_data:
+                if tile_image is not None:
                     # Calculate pixel offset in raster
                     x_offset = (x - min_tile_x) * 256
                     y_offset = (y - min_tile_y) * 256
 
-                    # Write tile to raster
-                    self._write_tile_to_raster(dataset, tile_data, x_offset, y_offset, bands)
+                    # Convert and write off the event loop so concurrent layers keep fetching
+                    await asyncio.to_thread(self._write_tile_to_raster, dataset, tile_image, x_offset, y_offset, bands)
 
                 if self.progress_callback:
                     self.progress_callback(processed, total_tiles, f"Writing tile {processed}/{total_tiles}...")
 
             # Flush to disk
-            dataset.FlushCache()
+            await asyncio.to_thread(dataset.FlushCache)
 
             # Build pyramids if multi-zoom enabled
             if multi_zoom:
                 logger.info("Building pyramids for multi-zoom support...")
                 if self.progress_callback:
                     self.progress_callback(total_tiles, total_tiles, "Building pyramids...")
-                self._build_pyramids(dataset, min_zoom, max_zoom)
+                await asyncio.to_thread(self._build_pyramids, dataset, min_zoom, max_zoom)
 
             logger.info(f"Created GeoTIFF file: {self.output_path}")
             return self.output_path
@@ -1,6 +1,5 @@
 """KMZ file generator."""
 
-import asyncio
 import logging
 import tempfile
 import zipfile
@@ -14,6 +13,7 @@ from src.core.base_tile_generator import BaseTileGenerator
 from src.core.tile_calculator import CHUNK_SIZE, TileCalculator
 from src.models.extent import Extent
 from src.models.layer_composition import LayerComposition
+from src.utils.event_loop import run_async
 
 logger = logging.getLogger(__name__)
 
@@ -235,16 +235,17 @@ class KMZGenerator(BaseTileGenerator):
             tree = ET.parse(kml_path)
             root = tree.getroot()
 
-            # Find the Document element
-            doc = root.find(".//kml:Document", KML_NS)
+            # Find the Document element (match the qualified tag directly rather than
+            # going through ElementPath)
+            kml_ns = KML_NS["kml"]
+            doc = next(root.iter(f"{{{kml_ns}}}Document"), None)
             if doc is None:
                 logger.error("No Document element found in generated KML")
                 return
 
             # Separate styles from features
             # Styles and StyleMaps must be at Document level, not in Folders
-            kml_ns = KML_NS["kml"]
-            style_tags = [f"{{{kml_ns}}}Style", f"{{{kml_ns}}}StyleMap"]
+            style_tags = {f"{{{kml_ns}}}Style", f"{{{kml_ns}}}StyleMap"}
             styles = [f for f in features if f.tag in style_tags]
             placemarks_and_folders = [f for f in features if f.tag not in style_tags]
 
@@ -534,8 +535,8 @@ class KMZGenerator(BaseTileGenerator):
         finally:
             # Cleanup
             await self.compositor.close()
-            if kml_temp_path and kml_temp_path.exists():
-                kml_temp_path.unlink()
+            if kml_temp_path:
+                kml_temp_path.unlink(missing_ok=True)
 
     def create_kmz(
         self,
@@ -567,7 +568,7 @@ class KMZGenerator(BaseTileGenerator):
             Path to created KMZ file
         """
         # Run async version (Python 3.14 compatible)
-        return asyncio.run(
+        return run_async(
             self.create_kmz_async(
                 extent,
                 min_zoom,
@@ -773,8 +774,7 @@ class KMZGenerator(BaseTileGenerator):
 
                 # Clean up individual tile files
                 for tile_path, _, _, _ in chunk_tiles:
-                    if tile_path.exists():
-                        tile_path.unlink()
+                    tile_path.unlink(missing_ok=True)
 
         return chunks
 
@@ -1019,8 +1019,8 @@ class KMZGenerator(BaseTileGenerator):
 
         finally:
             await self.compositor.close()
-            if kml_temp_path and kml_temp_path.exists():
-                kml_temp_path.unlink()
+            if kml_temp_path:
+                kml_temp_path.unlink(missing_ok=True)
 
     def _add_composited_chunks(self, chunks: list[dict], zoom: int, parent_folder=None):
         """
@@ -1,7 +1,9 @@
 """MBTiles format generator."""
 
+import asyncio
 import logging
 import sqlite3
+from collections import deque
 from pathlib import Path
 
 from src.core.base_tile_generator import BaseTileGenerator
@@ -12,6 +14,30 @@ from src.utils.image_encoding import ImageEncoder
 
 logger = logging.getLogger(__name__)
 
+# Version of the files this generator writes, recorded in output sidecars. Bump it
+# whenever the output bytes change for the same inputs so existing files are regenerated
+OUTPUT_FORMAT_VERSION = 1
+
+# Number of tiles inserted per executemany() batch
+_INSERT_BATCH_SIZE = 1000
+
+# Number of tiles encoded in worker threads while the next tiles are composited.
+# Pillow releases the GIL while encoding, so encodes overlap with each other and
+# with tile fetching.
+_ENCODE_WINDOW = 8
+
+# Connection settings for bulk-writing a fresh database. A partially written file is
+# regenerated rather than recovered, so durability is traded for insert speed. WAL is
+# avoided because it persists in the file and would require -wal/-shm files alongside
+# the exported .mbtiles for readers.
+_DB_PRAGMAS = """
+    PRAGMA page_size = 8192;
+    PRAGMA journal_mode = MEMORY;
+    PRAGMA synchronous = OFF;
+    PRAGMA temp_store = MEMORY;
+    PRAGMA cache_size = -65536;
+"""
+
 
 class MBTilesGenerator(BaseTileGenerator):
     """Generator for MBTiles format databases.
@@ -27,6 +53,9 @@ class MBTilesGenerator(BaseTileGenerator):
     def create_database_schema(conn: sqlite3.Connection) -> None:
         """Create MBTiles 1.3 schema with metadata and tiles tables.
 
+        The tile index is created separately by create_tile_index() once the tiles
+        have been inserted, which is much cheaper than maintaining it during the load.
+
         Args:
             conn: SQLite database connection
         """
@@ -50,14 +79,32 @@ class MBTilesGenerator(BaseTileGenerator):
             )
         """)
 
-        # Unique index on tile coordinates
-        cursor.execute("""
-            CREATE UNIQUE INDEX tile_index ON tiles
+        conn.commit()
+        logger.info("Created MBTiles schema")
+
+    @staticmethod
+    def create_tile_index(conn: sqlite3.Connection) -> None:
+        """Create the unique index on tile coordinates.
+
+        Args:
+            conn: SQLite database connection
+        """
+        conn.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS tile_index ON tiles
             (zoom_level, tile_column, tile_row)
         """)
+        conn.commit()
+
+    @staticmethod
+    def _insert_tiles(conn: sqlite3.Connection, rows: list[tuple[int, int, int, bytes]]) -> None:
+        """Insert a batch of tiles and commit.
 
+        Args:
+            conn: SQLite database connection
+            rows: (zoom_level, tile_column, tile_row, tile_data) tuples
+        """
+        conn.executemany("INSERT INTO tiles (zoom_level, tile_column, tile_row, tile_data) VALUES (?, ?, ?, ?)", rows)
         conn.commit()
-        logger.info("Created MBTiles schema")
 
     @staticmethod
     def xyz_to_tms(x: int, y: int, zoom: int) -> tuple[int, int]:
@@ -96,8 +143,6 @@ class MBTilesGenerator(BaseTileGenerator):
             image_format: "png" or "jpg"
             metadata_config: Dict with name, description, attribution, type
         """
-        cursor = conn.cursor()
-
         # Required metadata per MBTiles spec
         metadata = {
             "name": metadata_config.get("name", "Tile Export"),
@@ -118,9 +163,8 @@ class MBTilesGenerator(BaseTileGenerator):
             if value:
                 metadata[key] = value
 
-        # Insert all metadata
-        for name, value in metadata.items():
-            cursor.execute("INSERT INTO metadata (name, value) VALUES (?, ?)", (name, value))
+        # Insert all metadata in one batch
+        conn.executemany("INSERT INTO metadata (name, value) VALUES (?, ?)", metadata.items())
 
         conn.commit()
         logger.info(f"Populated metadata with {len(metadata)} fields")
@@ -154,19 +198,35 @@ class MBTilesGenerator(BaseTileGenerator):
         logger.info(f"Zoom range: {min_zoom}-{max_zoom}, Format: {image_format}")
 
         # Create database and schema
-        conn = sqlite3.connect(self.output_path)
+        # Inserts run in worker threads so the event loop keeps fetching tiles
+        conn = sqlite3.connect(self.output_path, check_same_thread=False)
+        conn.executescript(_DB_PRAGMAS)
         self.create_database_schema(conn)
         self.populate_metadata(conn, extent, min_zoom, max_zoom, image_format, metadata_config)
 
+        # In-flight encodes as (zoom, tms_x, tms_y, task), collected in order
+        encoding: deque[tuple[int, int, int, asyncio.Future]] = deque()
+
         try:
             # Calculate total tiles for progress tracking
-            total_tiles = sum(
-                TileCalculator.estimate_tile_count(extent.min_lon, extent.min_lat, extent.max_lon, extent.max_lat, zoom)
-                for zoom in range(min_zoom, max_zoom + 1)
+            total_tiles = int(
+                TileCalculator.estimate_tile_counts_range(
+                    extent.min_lon, extent.min_lat, extent.max_lon, extent.max_lat, min_zoom, max_zoom
+                ).sum()
             )
 
             processed = 0
-            cursor = conn.cursor()
+            pending_rows: list[tuple[int, int, int, bytes]] = []
+
+            async def collect_encoded(limit: int) -> None:
+                # Wait for encodes until at most `limit` remain, inserting full batches
+                nonlocal pending_rows
+                while len(encoding) > limit:
+                    tile_zoom, tms_x, tms_y, task = encoding.popleft()
+                    pending_rows.append((tile_zoom, tms_x, tms_y, await task))
+                    if len(pending_rows) >= _INSERT_BATCH_SIZE:
+                        await asyncio.to_thread(self._insert_tiles, conn, pending_rows)
+                        pending_rows = []
 
             # Generate tiles for each zoom level
             for zoom in range(min_zoom, max_zoom + 1):
@@ -177,33 +237,39 @@ class MBTilesGenerator(BaseTileGenerator):
                 logger.info(f"Processing zoom {zoom}: {len(tiles_at_zoom)} tiles")
 
                 for x, y in tiles_at_zoom:
-                    # Composite tile (returns PNG bytes from compositor)
-                    tile_data_png = await self.compositor.composite_tile(x, y, zoom, layer_compositions)
-
-                    if tile_data_png:
-                        # Encode to target format
-                        tile_data = ImageEncoder.encode_tile(tile_data_png, image_format, jpeg_quality)
+                    # Composite tile and encode straight to the target format
+                    tile_image = await self.compositor.composite_tile_image(x, y, zoom, layer_compositions)
 
+                    if tile_image is not None:
                         # Convert to TMS coordinates
                         tms_x, tms_y = self.xyz_to_tms(x, y, zoom)
 
-                        # Insert into database
-                        cursor.execute(
-                            "INSERT INTO tiles (zoom_level, tile_column, tile_row, tile_data) VALUES (?, ?, ?, ?)",
-                            (zoom, tms_x, tms_y, tile_data),
+                        # Encode in a worker thread, then queue for batched insertion
+                        task = asyncio.ensure_future(
+                            asyncio.to_thread(ImageEncoder.encode_image, tile_image, image_format, jpeg_quality)
                         )
+                        encoding.append((zoom, tms_x, tms_y, task))
+                        await collect_encoded(_ENCODE_WINDOW)
 
                     processed += 1
                     if self.progress_callback:
                         self.progress_callback(processed, total_tiles, f"Inserting tile {processed}/{total_tiles}...")
 
-                # Commit per zoom level for progress checkpoints
-                conn.commit()
+                # Insert remaining tiles and commit per zoom level for progress checkpoints
+                await collect_encoded(0)
+                await asyncio.to_thread(self._insert_tiles, conn, pending_rows)
+                pending_rows = []
                 logger.info(f"Completed zoom level {zoom}")
 
+            # Index the fully loaded table in one pass
+            await asyncio.to_thread(self.create_tile_index, conn)
+
             logger.info(f"Created MBTiles file: {self.output_path} ({total_tiles} tiles)")
             return self.output_path
 
         finally:
+            # On failure, let in-flight encodes finish before the compositor is closed
+            if encoding:
+                await asyncio.gather(*(task for *_, task in encoding), return_exceptions=True)
             conn.close()
             await self.close()
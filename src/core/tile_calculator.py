@@ -1,8 +1,11 @@
 """Tile calculation and coordinate conversion utilities."""
 
+import functools
 import logging
 import math
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 # Web compatible mode configuration
@@ -15,6 +18,23 @@ CHUNK_SIZE = 2  # Number of tiles per chunk dimension (2x2 = 512x512 pixels)
 WEB_COMPATIBLE_MAX_TOTAL_CHUNKS = 28  # Total chunks across all layers (conservative limit for reliability)
 
 
+def _parent_tile(coord: int, shift: int) -> int:
+    """
+    Get the ancestor of a tile coordinate `shift` zoom levels up.
+
+    Truncates toward zero like lat_lon_to_tile(), so out-of-range (negative)
+    coordinates near the poles map the same way as projecting at the lower zoom.
+
+    Args:
+        coord: Tile coordinate
+        shift: Number of zoom levels to go up
+
+    Returns:
+        Tile coordinate at the lower zoom
+    """
+    return coord >> shift if coord >= 0 else -(-coord >> shift)
+
+
 class TileCalculator:
     """Utilities for tile math and coordinate conversions."""
 
@@ -67,11 +87,11 @@ class TileCalculator:
         return {"north": lat_north, "south": lat_south, "east": lon_east, "west": lon_west}
 
     @staticmethod
-    def get_tiles_in_extent(
+    def get_tile_range(
         min_lon: float, min_lat: float, max_lon: float, max_lat: float, zoom: int
-    ) -> list[tuple[int, int]]:
+    ) -> tuple[int, int, int, int]:
         """
-        Get all tile coordinates within a geographic extent.
+        Get the inclusive tile coordinate bounds of a geographic extent.
 
         Args:
             min_lon: Minimum longitude
@@ -81,7 +101,7 @@ class TileCalculator:
             zoom: Zoom level
 
         Returns:
-            List of (x, y) tile coordinate tuples
+            Tuple of (x_min, y_min, x_max, y_max) tile coordinates
         """
         # Get tile coordinates for all four corners
         x_nw, y_nw = TileCalculator.lat_lon_to_tile(max_lat, min_lon, zoom)
@@ -95,6 +115,27 @@ class TileCalculator:
         y_min = min(y_nw, y_ne, y_sw, y_se)
         y_max = max(y_nw, y_ne, y_sw, y_se)
 
+        return (x_min, y_min, x_max, y_max)
+
+    @staticmethod
+    def get_tiles_in_extent(
+        min_lon: float, min_lat: float, max_lon: float, max_lat: float, zoom: int
+    ) -> list[tuple[int, int]]:
+        """
+        Get all tile coordinates within a geographic extent.
+
+        Args:
+            min_lon: Minimum longitude
+            min_lat: Minimum latitude
+            max_lon: Maximum longitude
+            max_lat: Maximum latitude
+            zoom: Zoom level
+
+        Returns:
+            List of (x, y) tile coordinate tuples
+        """
+        x_min, y_min, x_max, y_max = TileCalculator.get_tile_range(min_lon, min_lat, max_lon, max_lat, zoom)
+
         # Generate all tiles in the range
         tiles = []
         for x in range(x_min, x_max + 1):
@@ -104,10 +145,14 @@ class TileCalculator:
         return tiles
 
     @staticmethod
+    @functools.lru_cache(maxsize=4096)
     def estimate_tile_count(min_lon: float, min_lat: float, max_lon: float, max_lat: float, zoom: int) -> int:
         """
         Estimate the number of tiles in an extent.
 
+        Results are memoized, since option widgets re-estimate the same extent and
+        zoom range on every change.
+
         Args:
             min_lon: Minimum longitude
             min_lat: Minimum latitude
@@ -118,23 +163,45 @@ class TileCalculator:
         Returns:
             Number of tiles
         """
-        # Get tile coordinates for all four corners
-        x_nw, y_nw = TileCalculator.lat_lon_to_tile(max_lat, min_lon, zoom)
-        x_ne, y_ne = TileCalculator.lat_lon_to_tile(max_lat, max_lon, zoom)
-        x_sw, y_sw = TileCalculator.lat_lon_to_tile(min_lat, min_lon, zoom)
-        x_se, y_se = TileCalculator.lat_lon_to_tile(min_lat, max_lon, zoom)
-
-        # Find actual min/max tile coordinates
-        x_min = min(x_nw, x_ne, x_sw, x_se)
-        x_max = max(x_nw, x_ne, x_sw, x_se)
-        y_min = min(y_nw, y_ne, y_sw, y_se)
-        y_max = max(y_nw, y_ne, y_sw, y_se)
+        x_min, y_min, x_max, y_max = TileCalculator.get_tile_range(min_lon, min_lat, max_lon, max_lat, zoom)
 
         width = x_max - x_min + 1
         height = y_max - y_min + 1
 
         return width * height
 
+    @staticmethod
+    def estimate_tile_counts_range(
+        min_lon: float, min_lat: float, max_lon: float, max_lat: float, min_zoom: int, max_zoom: int
+    ) -> np.ndarray:
+        """
+        Estimate the number of tiles in an extent for every zoom in a range.
+
+        Equivalent to calling estimate_tile_count() for each zoom, but the extent
+        is projected once at max_zoom: each lower zoom's tile range is the parent
+        quadtree range, found by shifting the tile coordinates.
+
+        Args:
+            min_lon: Minimum longitude
+            min_lat: Minimum latitude
+            max_lon: Maximum longitude
+            max_lat: Maximum latitude
+            min_zoom: Minimum zoom level
+            max_zoom: Maximum zoom level (inclusive)
+
+        Returns:
+            Array of tile counts, one per zoom from min_zoom to max_zoom
+        """
+        x_min, y_min, x_max, y_max = TileCalculator.get_tile_range(min_lon, min_lat, max_lon, max_lat, max_zoom)
+
+        counts = []
+        for shift in range(max_zoom - min_zoom, -1, -1):
+            width = _parent_tile(x_max, shift) - _parent_tile(x_min, shift) + 1
+            height = _parent_tile(y_max, shift) - _parent_tile(y_min, shift) + 1
+            counts.append(width * height)
+
+        return np.array(counts, dtype=np.int64)
+
     @staticmethod
     def estimate_download_size(tile_count: int, layer_extension: str) -> float:
         """
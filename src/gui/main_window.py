@@ -22,6 +22,7 @@ from src.gui.map_widget import MapWidget
 from src.gui.settings_panel import SettingsPanel
 from src.models.generation_request import GenerationRequest
 from src.outputs import get_output_handler
+from src.utils.event_loop import close_event_loop
 
 logger = logging.getLogger(__name__)
 
@@ -89,7 +90,7 @@ class ExportWorker(QThread):
 
                 # Generate output using the handler
                 result_path = handler.generate(
-                    output_path=output_config.path,
+                    output_path=Path(output_config.path),
                     extent=self.request.extent,
                     min_zoom=min_zoom,
                     max_zoom=max_zoom,
@@ -107,6 +108,9 @@ class ExportWorker(QThread):
         except Exception as e:
             logger.exception("Error during export")
             self.error.emit(str(e))
+        finally:
+            # Release the event loop used for this export before the thread exits
+            close_event_loop()
 
 
 class MainWindow(QMainWindow):
@@ -269,16 +273,15 @@ class MainWindow(QMainWindow):
         layers = [comp.layer_config for comp in request.layer_compositions]
 
         # Calculate total tiles across all zoom levels
-        total_tiles = 0
-        for zoom_level in range(request.min_zoom, request.max_zoom + 1):
-            tile_count = TileCalculator.estimate_tile_count(
-                request.extent.min_lon,
-                request.extent.min_lat,
-                request.extent.max_lon,
-                request.extent.max_lat,
-                zoom_level,
-            )
-            total_tiles += tile_count * len(layers)
+        tile_counts = TileCalculator.estimate_tile_counts_range(
+            request.extent.min_lon,
+            request.extent.min_lat,
+            request.extent.max_lon,
+            request.extent.max_lat,
+            request.min_zoom,
+            request.max_zoom,
+        )
+        total_tiles = int(tile_counts.sum()) * len(layers)
 
         # Warn if large download
         if total_tiles > 1000:
@@ -15,7 +15,7 @@ from PyQt6.QtWidgets import (
 from src.models.extent import Extent
 from src.models.layer_composition import LayerComposition
 from src.models.outputs import GeoTIFFOutput
-from src.outputs import get_output_handler
+from src.outputs import estimate_tiles
 
 
 class GeoTIFFOptionsWidget(QWidget):
@@ -201,11 +201,11 @@ class GeoTIFFOptionsWidget(QWidget):
             return
 
         try:
-            # Use the output handler to calculate estimates
-            handler = get_output_handler("geotiff")
+            # Use the registered estimate function for this output type
             # Construct output model for estimation
             output = GeoTIFFOutput(type="geotiff", path="", **self.get_options())
-            estimates = handler.estimate_tiles(
+            estimates = estimate_tiles(
+                "geotiff",
                 self.extent,
                 self.min_zoom,
                 self.max_zoom,
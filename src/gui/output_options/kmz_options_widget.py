@@ -6,7 +6,7 @@ from PyQt6.QtWidgets import QCheckBox, QComboBox, QGroupBox, QHBoxLayout, QLabel
 from src.models.extent import Extent
 from src.models.layer_composition import LayerComposition
 from src.models.outputs import KMZOutput
-from src.outputs import get_output_handler
+from src.outputs import estimate_tiles
 
 
 class KMZOptionsWidget(QWidget):
@@ -138,11 +138,11 @@ class KMZOptionsWidget(QWidget):
             return
 
         try:
-            # Use the output handler to calculate estimates
-            handler = get_output_handler("kmz")
+            # Use the registered estimate function for this output type
             # Construct output model for estimation
             output = KMZOutput(type="kmz", path="", **self.get_options())
-            estimates = handler.estimate_tiles(
+            estimates = estimate_tiles(
+                "kmz",
                 self.extent,
                 self.min_zoom,
                 self.max_zoom,
@@ -14,7 +14,7 @@ from PyQt6.QtWidgets import (
 from src.models.extent import Extent
 from src.models.layer_composition import LayerComposition
 from src.models.outputs import MBTilesOutput
-from src.outputs import get_output_handler
+from src.outputs import estimate_tiles
 
 
 class MBTilesOptionsWidget(QWidget):
@@ -203,11 +203,11 @@ class MBTilesOptionsWidget(QWidget):
             return
 
         try:
-            # Use the output handler to calculate estimates
-            handler = get_output_handler("mbtiles")
+            # Use the registered estimate function for this output type
             # Construct output model for estimation
             output = MBTilesOutput(type="mbtiles", path="", **self.get_options())
-            estimates = handler.estimate_tiles(
+            estimates = estimate_tiles(
+                "mbtiles",
                 self.extent,
                 self.min_zoom,
                 self.max_zoom,
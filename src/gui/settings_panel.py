@@ -35,7 +35,7 @@ from src.gui.zoom_range_widget import ZoomRangeWidget
 from src.models.extent import Extent
 from src.models.extent_config import ExtentConfig
 from src.models.generation_request import GenerationRequest
-from src.models.layer_composition import LayerComposition
+from src.models.layer_composition import LayerComposition, zoom_in_available
 from src.models.outputs import KMZOutput, OutputUnion
 
 # Blend modes supported by KML (Google Earth)
@@ -349,7 +349,7 @@ class LayerItemWidget(QFrame):
                     f"Layer only supports zoom {self.composition.layer_config.min_zoom}-{self.composition.layer_config.max_zoom}"
                 )
             else:
-                checkbox.setChecked(zoom in self.composition.selected_zooms)
+                checkbox.setChecked(zoom_in_available(zoom, self.composition.selected_zooms_mask))
                 checkbox.stateChanged.connect(lambda state, z=zoom: self._on_zoom_checkbox_changed(z, state))
 
             self.zoom_checkboxes[zoom] = checkbox
@@ -368,9 +368,9 @@ class LayerItemWidget(QFrame):
             state: Checkbox state (Qt.CheckState value)
         """
         if state == Qt.CheckState.Checked.value:
-            self.composition.selected_zooms.add(zoom)
+            self.composition.selected_zooms_mask |= 1 << zoom
         else:
-            self.composition.selected_zooms.discard(zoom)
+            self.composition.selected_zooms_mask &= ~(1 << zoom)
 
         self.changed.emit()
 
@@ -931,7 +931,6 @@ class SettingsPanel(QWidget):
             blend_mode="normal",
             export_mode="composite",
             lod_mode="all_zooms",
-            selected_zooms=set(),
             enabled=True,
         )
 
@@ -1377,8 +1376,7 @@ class SettingsPanel(QWidget):
             self._clear_all_layers()
 
             # 2. Load layers (YAML has compositing order, reverse for UI display)
-            for layer_spec in reversed(state["layers"]):
-                comp = LayerComposition.from_dict(layer_spec, layer_registry)
+            for comp in reversed(LayerComposition.from_dict_many(state["layers"], layer_registry)):
                 self._add_layer_with_composition(comp)
 
             # 3. Set zoom range
@@ -15,10 +15,22 @@ from PyQt6.QtCore import QBuffer, QByteArray, QIODevice, QStandardPaths
 from PyQt6.QtWebEngineCore import QWebEngineUrlRequestJob, QWebEngineUrlSchemeHandler
 
 from src.core.config import LayerConfig
-from src.models.layer_composition import LayerComposition
+from src.models.layer_composition import LayerComposition, zoom_in_available
+from src.utils.lru_cache import LRUCache
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of composited preview tiles kept in memory
+PREVIEW_CACHE_SIZE = 512
+
+# Maximum number of decoded source tiles kept in memory by each compositor (~256 KB
+# each as RGBA, so up to ~32 MB)
+SOURCE_TILE_CACHE_SIZE = 128
+
+# Seconds to keep resolved tile hosts; aiohttp's default (10s) re-resolves the same
+# few hosts many times over a long export
+DNS_CACHE_TTL = 300
+
 
 class TileCompositor:
     """Composites multiple tile layers with blend modes and opacity."""
@@ -32,6 +44,15 @@ class TileCompositor:
         self.session: aiohttp.ClientSession | None = None
         self.enable_cache = enable_cache
 
+        # Decoded source tiles keyed on URL, so zoom levels and layers sharing this
+        # compositor reuse tiles instead of re-reading and re-decoding them from disk.
+        # Released with the compositor at the end of an export
+        self._source_tile_cache: LRUCache[str, Image.Image] = LRUCache(SOURCE_TILE_CACHE_SIZE)
+
+        # Downloads that failed (network errors and unexpected HTTP statuses). Failed tiles
+        # are composited as transparent, so callers check this before treating output as final
+        self.failed_fetches = 0
+
         # Initialize cache directory
         # QStandardPaths.CacheLocation already includes org/app name if set via QCoreApplication
         cache_base = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.CacheLocation)
@@ -55,10 +76,38 @@ class TileCompositor:
         url_hash = hashlib.sha256(url.encode("utf-8")).hexdigest()
         return self.cache_dir / f"{url_hash}.png"
 
+    def _get_memory_cached_tile(self, url: str) -> Image.Image | None:
+        """
+        Get a decoded source tile from the in-memory cache.
+
+        Args:
+            url: Tile URL
+
+        Returns:
+            Cached RGBA tile, or None if caching is disabled or the tile isn't cached
+        """
+        if not self.enable_cache:
+            return None
+
+        return self._source_tile_cache.get(url)
+
+    def _memory_cache_tile(self, url: str, tile: Image.Image) -> None:
+        """
+        Store a decoded source tile in the in-memory cache.
+
+        Args:
+            url: Tile URL
+            tile: Decoded RGBA tile (must not be modified afterwards)
+        """
+        if not self.enable_cache:
+            return
+
+        self._source_tile_cache.put(url, tile)
+
     async def get_session(self) -> aiohttp.ClientSession:
         """Get or create aiohttp session."""
         if self.session is None or self.session.closed:
-            self.session = aiohttp.ClientSession()
+            self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(ttl_dns_cache=DNS_CACHE_TTL))
         return self.session
 
     def _get_effective_tile_coords(self, x: int, y: int, z: int, layer_config: LayerConfig) -> tuple:
@@ -166,12 +215,19 @@ class TileCompositor:
         Returns:
             PIL Image or None if fetch failed
         """
+        # Check in-memory cache first, then disk cache (if enabled)
+        tile = self._get_memory_cached_tile(url)
+        if tile is not None:
+            if needs_upsampling:
+                tile = self._upsample_tile(tile, scale_factor, offset_x, offset_y)
+            return tile
+
         cache_path = self._get_cache_path(url)
 
-        # Check cache first (if enabled)
         if self.enable_cache and cache_path.exists():
             try:
                 tile = Image.open(cache_path).convert("RGBA")
+                self._memory_cache_tile(url, tile)
 
                 # Upsample if needed using bilinear interpolation
                 if needs_upsampling:
@@ -187,6 +243,7 @@ class TileCompositor:
             response = requests.get(url, timeout=10)
             if response.status_code == 200:
                 tile = Image.open(io.BytesIO(response.content)).convert("RGBA")
+                self._memory_cache_tile(url, tile)
 
                 # Save to cache (if enabled)
                 if self.enable_cache:
@@ -225,12 +282,19 @@ class TileCompositor:
         Returns:
             PIL Image or None if fetch failed
         """
+        # Check in-memory cache first, then disk cache (if enabled)
+        tile = self._get_memory_cached_tile(url)
+        if tile is not None:
+            if needs_upsampling:
+                tile = self._upsample_tile(tile, scale_factor, offset_x, offset_y)
+            return tile
+
         cache_path = self._get_cache_path(url)
 
-        # Check cache first (if enabled)
         if self.enable_cache and cache_path.exists():
             try:
                 tile = Image.open(cache_path).convert("RGBA")
+                self._memory_cache_tile(url, tile)
 
                 # Upsample if needed using bilinear interpolation
                 if needs_upsampling:
@@ -248,6 +312,7 @@ class TileCompositor:
                 if response.status == 200:
                     data = await response.read()
                     tile = Image.open(io.BytesIO(data)).convert("RGBA")
+                    self._memory_cache_tile(url, tile)
 
                     # Save to cache (if enabled)
                     if self.enable_cache:
@@ -263,11 +328,38 @@ class TileCompositor:
                     return tile
                 else:
                     logger.warning(f"Failed to fetch tile {url}: HTTP {response.status}")
+                    # 404 means the source has no tile here, which a retry won't change
+                    if response.status != 404:
+                        self.failed_fetches += 1
                     return None
         except Exception as e:
             logger.warning(f"Error fetching tile {url}: {e}")
+            self.failed_fetches += 1
             return None
 
+    @staticmethod
+    def _covers_canvas(tile: Image.Image, opacity: int, blend_mode: str) -> bool:
+        """
+        Check whether a layer fully replaces everything composited beneath it.
+
+        A fully opaque tile drawn with normal blend at full opacity gives its own
+        pixels regardless of the base, so lower layers have no effect on the result.
+
+        Args:
+            tile: Tile image
+            opacity: Layer opacity (0-100)
+            blend_mode: Layer blend mode
+
+        Returns:
+            True if the layer hides all layers below it
+        """
+        return (
+            opacity >= 100
+            and blend_mode == "normal"
+            and tile.mode == "RGBA"
+            and tile.getchannel("A").getextrema() == (255, 255)
+        )
+
     @staticmethod
     def _blend_tile_stack(tiles: list[tuple]) -> bytes:
         """
@@ -281,6 +373,46 @@ class TileCompositor:
         Returns:
             PNG image bytes
         """
+        return TileCompositor._encode_png(TileCompositor._blend_tile_stack_image(tiles))
+
+    @staticmethod
+    def _encode_png(image: Image.Image) -> bytes:
+        """
+        Encode a composited tile as PNG.
+
+        Args:
+            image: Composited tile image
+
+        Returns:
+            PNG image bytes
+        """
+        buffer = io.BytesIO()
+        # Drop any ICC profile carried over from a source tile so output matches blended tiles
+        image.save(buffer, format="PNG", icc_profile=None)
+        return buffer.getvalue()
+
+    @staticmethod
+    def _blend_tile_stack_image(tiles: list[tuple]) -> Image.Image:
+        """
+        Composite a stack of tiles into a single image.
+
+        Args:
+            tiles: List of (tile_image, opacity, blend_mode) tuples
+
+        Returns:
+            Composited RGBA image. May be one of the input tiles, so it must not be modified.
+        """
+        # Drop layers hidden beneath the topmost layer that covers the whole canvas
+        for index in range(len(tiles) - 1, 0, -1):
+            if TileCompositor._covers_canvas(*tiles[index]):
+                tiles = tiles[index:]
+                break
+
+        # Fast path: a single covering layer composites to itself, so return it without
+        # blending. Partially transparent tiles still go through blending, which premultiplies RGB.
+        if len(tiles) == 1 and TileCompositor._covers_canvas(*tiles[0]):
+            return tiles[0][0]
+
         result = Image.new("RGBA", (256, 256), (0, 0, 0, 0))
 
         for tile, opacity, blend_mode in tiles:
@@ -330,10 +462,7 @@ class TileCompositor:
             result_array = np.clip(result_array * 255, 0, 255).astype(np.uint8)
             result = Image.fromarray(result_array, mode="RGBA")
 
-        # Convert to PNG bytes
-        buffer = io.BytesIO()
-        result.save(buffer, format="PNG")
-        return buffer.getvalue()
+        return result
 
     def apply_opacity(self, image: Image.Image, opacity: int) -> Image.Image:
         """
@@ -414,9 +543,32 @@ class TileCompositor:
         return Image.fromarray(result_array, mode="RGBA")
 
     async def composite_tile(self, x: int, y: int, z: int, layer_compositions: list[LayerComposition]) -> bytes | None:
+        """
+        Composite a tile from multiple layers and encode it as PNG.
+
+        See composite_tile_image() for how layers are fetched, resampled and blended.
+
+        Args:
+            x: Tile X coordinate
+            y: Tile Y coordinate
+            z: Zoom level (target zoom to generate)
+            layer_compositions: List of LayerComposition objects
+
+        Returns:
+            PNG image bytes or None if composition failed
+        """
+        image = await self.composite_tile_image(x, y, z, layer_compositions)
+        return self._encode_png(image) if image is not None else None
+
+    async def composite_tile_image(
+        self, x: int, y: int, z: int, layer_compositions: list[LayerComposition]
+    ) -> Image.Image | None:
         """
         Composite a tile from multiple layers with per-layer LOD support and automatic resampling.
 
+        Returns the composited image without encoding it, for callers that re-encode to
+        another format or decode to raw pixels anyway.
+
         RESAMPLING ARCHITECTURE:
         -----------------------
         This method supports comprehensive resampling to generate tiles at any zoom level:
@@ -432,14 +584,12 @@ class TileCompositor:
             layer_compositions: List of LayerComposition objects
 
         Returns:
-            PNG image bytes or None if composition failed
+            Composited RGBA image (must not be modified, as it may be a cached source
+            tile) or None if composition failed
         """
         if not layer_compositions:
             # Return transparent tile
-            img = Image.new("RGBA", (256, 256), (0, 0, 0, 0))
-            buffer = io.BytesIO()
-            img.save(buffer, format="PNG")
-            return buffer.getvalue()
+            return Image.new("RGBA", (256, 256), (0, 0, 0, 0))
 
         # Fetch all tiles
         tiles = []
@@ -459,6 +609,10 @@ class TileCompositor:
             # Find best source zoom for this layer (may require resampling)
             source_zoom = composition.find_best_source_zoom(z, available_zooms)
 
+            if not composition.is_within_resample_distance(z, source_zoom):
+                logger.debug(f"Skipping {composition.layer_config.name} at zoom {z} (beyond max resample distance)")
+                continue
+
             # Calculate fetch coordinates and determine if resampling is needed
             if source_zoom == z:
                 # Direct fetch - no resampling
@@ -493,12 +647,13 @@ class TileCompositor:
                 tiles.append((Image.new("RGBA", (256, 256), (0, 0, 0, 0)), composition.opacity, composition.blend_mode))
 
         # Composite tiles using shared blending logic
-        return self._blend_tile_stack(tiles)
+        return self._blend_tile_stack_image(tiles)
 
     async def close(self):
-        """Close aiohttp session."""
+        """Close aiohttp session and release decoded tiles held in memory."""
         if self.session and not self.session.closed:
             await self.session.close()
+        self._source_tile_cache.clear()
 
 
 class PreviewTileSchemeHandler(QWebEngineUrlSchemeHandler):
@@ -519,6 +674,8 @@ class PreviewTileSchemeHandler(QWebEngineUrlSchemeHandler):
         self.active_buffers = {}
         # Version counter to track composition changes - helps avoid processing stale requests
         self.composition_version = 0
+        # LRU cache of composited tiles keyed on (z, x, y, composition signatures)
+        self.composite_cache: LRUCache[tuple, bytes] = LRUCache(PREVIEW_CACHE_SIZE)
 
     def set_layer_compositions(self, compositions: list[LayerComposition]):
         """
@@ -554,10 +711,17 @@ class PreviewTileSchemeHandler(QWebEngineUrlSchemeHandler):
                 img.save(buffer, format="PNG")
                 return buffer.getvalue()
 
+            # Reuse a previous composite of the same tile with identical layer settings
+            cache_key = (z, x, y, tuple(composition.signature() for composition in compositions))
+            cached = self.composite_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
             # Fetch all tiles synchronously
             # Note: Preview avoids downsampling (uses _get_effective_tile_coords)
             # but still respects select_zooms LOD configuration
             tiles = []
+            fetch_failed = False
             for composition in compositions:
                 # Skip disabled layers
                 if not composition.enabled:
@@ -565,7 +729,7 @@ class PreviewTileSchemeHandler(QWebEngineUrlSchemeHandler):
                     continue
 
                 # For select_zooms mode, only include layer at explicitly selected zoom levels
-                if composition.lod_mode == "select_zooms" and z not in composition.selected_zooms:
+                if composition.lod_mode == "select_zooms" and not zoom_in_available(z, composition.selected_zooms_mask):
                     logger.debug(f"Skipping {composition.layer_config.name} at zoom {z} (zoom not in selected_zooms)")
                     continue
 
@@ -588,12 +752,19 @@ class PreviewTileSchemeHandler(QWebEngineUrlSchemeHandler):
                     tiles.append((tile, composition.opacity, composition.blend_mode))
                 else:
                     # Use transparent tile if fetch failed
+                    fetch_failed = True
                     tiles.append(
                         (Image.new("RGBA", (256, 256), (0, 0, 0, 0)), composition.opacity, composition.blend_mode)
                     )
 
             # Composite tiles using shared blending logic
-            return TileCompositor._blend_tile_stack(tiles)
+            tile_data = TileCompositor._blend_tile_stack(tiles)
+
+            # Don't cache placeholders for failed fetches so they are retried on the next request
+            if not fetch_failed:
+                self.composite_cache.put(cache_key, tile_data)
+
+            return tile_data
 
         except Exception as e:
             logger.exception(f"Error compositing tile {z}/{x}/{y}: {e}")
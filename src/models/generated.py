@@ -294,6 +294,10 @@ class Layers1(BaseModel):
     """
     Selected zoom levels (required when lod_mode=select_zooms). Each value must be 0-18.
     """
+    max_resample_distance: int | None = Field(default=None, ge=0)
+    """
+    Maximum number of zoom levels to resample across. Zooms further than this from every available zoom are skipped for this layer. Unlimited when omitted.
+    """
 
 
 class Extension(StrEnum):
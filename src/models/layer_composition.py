@@ -1,12 +1,66 @@
 """Layer composition model."""
 
-from dataclasses import dataclass, field, replace
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, replace
 from typing import Any
 
-from src.core.config import LayerConfig
+import numpy as np
 
+from src.core.config import LAYERS, LayerConfig
 
-@dataclass
+# Allowed values for the string-valued settings, shared by every instance
+_VALID_BLEND_MODES = frozenset({"normal", "multiply", "screen", "overlay"})
+_VALID_EXPORT_MODES = frozenset({"composite", "separate"})
+_VALID_LOD_MODES = frozenset({"all_zooms", "select_zooms"})
+
+
+def zooms_to_mask(zooms: Iterable[int]) -> int:
+    """
+    Pack zoom levels into a bitmask (bit z set for zoom z).
+
+    Args:
+        zooms: Zoom levels to include
+
+    Returns:
+        Zoom bitmask
+    """
+    mask = 0
+    for zoom in zooms:
+        mask |= 1 << zoom
+    return mask
+
+
+def zoom_in_available(zoom: int, mask: int) -> bool:
+    """
+    Check whether a zoom level is set in a zoom bitmask.
+
+    Args:
+        zoom: Zoom level to test
+        mask: Zoom bitmask
+
+    Returns:
+        True if the zoom is in the mask
+    """
+    return zoom >= 0 and (mask >> zoom) & 1 == 1
+
+
+def iter_zooms(mask: int) -> Iterator[int]:
+    """
+    Iterate the zoom levels set in a zoom bitmask.
+
+    Args:
+        mask: Zoom bitmask
+
+    Yields:
+        Zoom levels in ascending order
+    """
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+@dataclass(slots=True)
 class LayerComposition:
     """Composition settings for a single layer."""
 
@@ -15,27 +69,37 @@ class LayerComposition:
     blend_mode: str  # 'normal', 'multiply', 'screen', 'overlay'
     export_mode: str = "composite"  # 'composite' or 'separate'
     lod_mode: str = "all_zooms"  # 'all_zooms' or 'select_zooms'
-    selected_zooms: set[int] = field(default_factory=set)  # Used when lod_mode = "select_zooms"
+    selected_zooms_mask: int = 0  # Bitmask of selected zooms, used when lod_mode = "select_zooms"
     enabled: bool = True  # Whether this layer is active in the composition
+    max_resample_distance: int | None = None  # Max zoom levels to resample across (None = unlimited)
 
-    def __post_init__(self):
+    def __post_init__(self) -> None:
         """Validate composition settings."""
-        if not 0 <= self.opacity <= 100:
+        if self.opacity < 0 or self.opacity > 100:
             raise ValueError(f"Opacity must be between 0 and 100, got {self.opacity}")
 
-        valid_modes = {"normal", "multiply", "screen", "overlay"}
-        if self.blend_mode not in valid_modes:
-            raise ValueError(f"Blend mode must be one of {valid_modes}, got {self.blend_mode}")
+        if self.blend_mode not in _VALID_BLEND_MODES:
+            raise ValueError(f"Blend mode must be one of {sorted(_VALID_BLEND_MODES)}, got {self.blend_mode}")
+
+        if self.export_mode not in _VALID_EXPORT_MODES:
+            raise ValueError(f"Export mode must be one of {sorted(_VALID_EXPORT_MODES)}, got {self.export_mode}")
 
-        valid_export_modes = {"composite", "separate"}
-        if self.export_mode not in valid_export_modes:
-            raise ValueError(f"Export mode must be one of {valid_export_modes}, got {self.export_mode}")
+        if self.lod_mode not in _VALID_LOD_MODES:
+            raise ValueError(f"LOD mode must be one of {sorted(_VALID_LOD_MODES)}, got {self.lod_mode}")
 
-        valid_lod_modes = {"all_zooms", "select_zooms"}
-        if self.lod_mode not in valid_lod_modes:
-            raise ValueError(f"LOD mode must be one of {valid_lod_modes}, got {self.lod_mode}")
+        if self.max_resample_distance is not None and self.max_resample_distance < 0:
+            raise ValueError(f"Max resample distance must be non-negative, got {self.max_resample_distance}")
 
-    def get_available_zooms(self) -> set[int]:
+    @property
+    def selected_zooms(self) -> frozenset[int]:
+        """Selected zoom levels as a set (materialized from selected_zooms_mask)."""
+        return frozenset(iter_zooms(self.selected_zooms_mask))
+
+    @selected_zooms.setter
+    def selected_zooms(self, zooms: Iterable[int]) -> None:
+        self.selected_zooms_mask = zooms_to_mask(zooms)
+
+    def get_available_zooms(self) -> int:
         """
         Get zoom levels available for this layer.
 
@@ -43,7 +107,7 @@ class LayerComposition:
         ===================================
         This method returns ALL zoom levels that the layer can provide based on:
         1. Layer's native zoom range (min_zoom to max_zoom from layer config)
-        2. LOD configuration (all_zooms or select_zooms with selected_zooms set)
+        2. LOD configuration (all_zooms or select_zooms with selected_zooms_mask)
 
         This method does NOT restrict by output zoom range. This is intentional to support
         comprehensive resampling capabilities.
@@ -70,17 +134,20 @@ class LayerComposition:
         - Preference is given to higher zoom when distances are equal (better quality)
 
         Returns:
-            Set of zoom levels available for this layer as source zooms
+            Bitmask of zoom levels available for this layer as source zooms
+            (bit z set for zoom z; see iter_zooms() and zoom_in_available())
         """
+        # All zooms within layer's native capability range
+        native_mask = ((1 << (self.layer_config.max_zoom + 1)) - 1) & ~((1 << self.layer_config.min_zoom) - 1)
+
         if self.lod_mode == "all_zooms":
-            # Use all zooms within layer's native capability range
-            return set(range(self.layer_config.min_zoom, self.layer_config.max_zoom + 1))
+            return native_mask
         else:
             # Use only selected zooms, filtered to layer's native capability
             # No output range restriction - allow resampling to any target zoom
-            return {z for z in self.selected_zooms if self.layer_config.min_zoom <= z <= self.layer_config.max_zoom}
+            return self.selected_zooms_mask & native_mask
 
-    def find_best_source_zoom(self, target_zoom: int, available_zooms: set[int]) -> int:
+    def find_best_source_zoom(self, target_zoom: int, available_zooms: int) -> int:
         """
         Find the best available zoom level to use for a target zoom.
 
@@ -89,34 +156,35 @@ class LayerComposition:
 
         Args:
             target_zoom: The desired zoom level
-            available_zooms: Set of available zoom levels for this layer
+            available_zooms: Bitmask of available zoom levels for this layer
 
         Returns:
             Best zoom level to use (may require resampling)
         """
-        if target_zoom in available_zooms:
+        if zoom_in_available(target_zoom, available_zooms):
             return target_zoom
 
         if not available_zooms:
             # Fall back to layer's max zoom if no zooms available
             return min(self.layer_config.max_zoom, target_zoom)
 
-        # Find closest zoom level
-        lower_zooms = [z for z in available_zooms if z < target_zoom]
-        higher_zooms = [z for z in available_zooms if z > target_zoom]
+        # Split into zooms below and above the target
+        lower_mask = available_zooms & ((1 << target_zoom) - 1)
+        higher_mask = available_zooms >> (target_zoom + 1)
+
+        # Highest set bit below the target, lowest set bit above it
+        closest_lower = lower_mask.bit_length() - 1
+        closest_higher = target_zoom + (higher_mask & -higher_mask).bit_length()
 
-        if not lower_zooms:
+        if not lower_mask:
             # Only higher zooms available - downsample from lowest available
-            return min(higher_zooms)
+            return closest_higher
 
-        if not higher_zooms:
+        if not higher_mask:
             # Only lower zooms available - upsample from highest available
-            return max(lower_zooms)
+            return closest_lower
 
         # Both directions available - check distances
-        closest_lower = max(lower_zooms)
-        closest_higher = min(higher_zooms)
-
         lower_distance = target_zoom - closest_lower
         higher_distance = closest_higher - target_zoom
 
@@ -128,6 +196,103 @@ class LayerComposition:
             # Equidistant - prefer downsampling (higher zoom)
             return closest_higher
 
+    def find_best_source_zooms(self, target_zooms: np.ndarray, available_zooms: int) -> np.ndarray:
+        """
+        Vectorized version of find_best_source_zoom() for many target zooms at once.
+
+        Resolves every target zoom with a single np.searchsorted over the sorted
+        available zooms instead of one Python call per target. Selection rules are
+        identical: exact matches are used directly, otherwise the closest zoom wins
+        and ties prefer the higher zoom (downsampling).
+
+        Args:
+            target_zooms: Array of desired zoom levels
+            available_zooms: Bitmask of available zoom levels for this layer
+
+        Returns:
+            Array of best source zoom levels, one per target zoom
+        """
+        targets = np.asarray(target_zooms, dtype=np.int64)
+
+        if not available_zooms:
+            # Fall back to layer's max zoom if no zooms available
+            return np.minimum(targets, self.layer_config.max_zoom)
+
+        zooms = np.fromiter(iter_zooms(available_zooms), dtype=np.int64)
+        last = len(zooms) - 1
+
+        # Index of first available zoom >= target; neighbours on either side are the candidates
+        idx = np.searchsorted(zooms, targets)
+        lower = zooms[np.clip(idx - 1, 0, last)]
+        higher = zooms[np.clip(idx, 0, last)]
+
+        # Out-of-range targets clamp both candidates to the same end zoom, and an exact
+        # match gives a zero higher distance, so a strict comparison covers every case
+        # (equidistant targets fall through to the higher zoom)
+        return np.where(targets - lower < higher - targets, lower, higher)
+
+    def is_within_resample_distance(self, target_zoom: int, source_zoom: int) -> bool:
+        """
+        Check whether resampling from source_zoom to target_zoom is allowed for this layer.
+
+        Args:
+            target_zoom: The zoom level being generated
+            source_zoom: The zoom level tiles would be fetched from
+
+        Returns:
+            True if the zoom distance is within max_resample_distance (always True when unlimited)
+        """
+        return self.max_resample_distance is None or abs(target_zoom - source_zoom) <= self.max_resample_distance
+
+    def iter_effective_zooms(self, target_min: int, target_max: int) -> Iterator[int]:
+        """
+        Iterate the target zooms this layer contributes to.
+
+        Zoom levels whose best source zoom is more than max_resample_distance away are
+        skipped, so generators don't fetch and blend heavily resampled tiles for them.
+        With no limit set, every zoom in the range is yielded.
+
+        Args:
+            target_min: Minimum target zoom level (inclusive)
+            target_max: Maximum target zoom level (inclusive)
+
+        Yields:
+            Target zoom levels within the resample distance, in ascending order
+        """
+        if self.max_resample_distance is None:
+            yield from range(target_min, target_max + 1)
+            return
+
+        available_zooms = self.get_available_zooms()
+        if not available_zooms:
+            return
+
+        targets = np.arange(target_min, target_max + 1)
+        sources = self.find_best_source_zooms(targets, available_zooms)
+        for target_zoom in targets[np.abs(targets - sources) <= self.max_resample_distance]:
+            yield int(target_zoom)
+
+    def signature(self) -> tuple[LayerConfig, int, str, str, bool, str, int, int | None]:
+        """
+        Get a hashable snapshot of every setting that affects rendered tiles.
+
+        Two compositions with equal signatures produce identical tiles, so the
+        signature can be used as (part of) a cache key for composited output.
+
+        Returns:
+            Tuple of layer config and composition settings
+        """
+        return (
+            self.layer_config,
+            self.opacity,
+            self.blend_mode,
+            self.export_mode,
+            self.enabled,
+            self.lod_mode,
+            self.selected_zooms_mask,
+            self.max_resample_distance,
+        )
+
     def to_dict(self) -> dict[str, Any]:
         """
         Convert composition to dictionary for YAML serialization.
@@ -141,6 +306,15 @@ class LayerComposition:
             "blend_mode": self.blend_mode,
         }
 
+        # Fast path: all optional settings at their defaults
+        if (
+            self.export_mode == "composite"
+            and self.enabled
+            and self.lod_mode == "all_zooms"
+            and self.max_resample_distance is None
+        ):
+            return result
+
         # Only include export_mode if not default
         if self.export_mode != "composite":
             result["export_mode"] = self.export_mode
@@ -152,8 +326,12 @@ class LayerComposition:
         # Only include LOD config if not default
         if self.lod_mode != "all_zooms":
             result["lod_mode"] = self.lod_mode
-            if self.lod_mode == "select_zooms" and self.selected_zooms:
-                result["selected_zooms"] = sorted(self.selected_zooms)
+            if self.lod_mode == "select_zooms" and self.selected_zooms_mask:
+                result["selected_zooms"] = list(iter_zooms(self.selected_zooms_mask))
+
+        # Only include resample limit if set
+        if self.max_resample_distance is not None:
+            result["max_resample_distance"] = self.max_resample_distance
 
         return result
 
@@ -166,7 +344,7 @@ class LayerComposition:
 
         Args:
             data: Dictionary with name, opacity (optional), blend_mode (optional),
-                  lod_mode (optional), selected_zooms (optional),
+                  lod_mode (optional), selected_zooms (optional), max_resample_distance (optional),
                   or a simple string representing the layer name
             layer_registry: Optional custom layer registry to use instead of default LAYERS.
                            Allows custom layer sources defined in config files.
@@ -177,8 +355,6 @@ class LayerComposition:
         Raises:
             ValueError: If layer name is not found in layer registry
         """
-        from src.core.config import LAYERS
-
         # Use provided registry or fall back to default LAYERS
         if layer_registry is None:
             layer_registry = LAYERS
@@ -190,16 +366,18 @@ class LayerComposition:
             blend_mode = "normal"
             export_mode = "composite"
             lod_mode = "all_zooms"
-            selected_zooms = set()
+            selected_zooms_mask = 0
             enabled = True
+            max_resample_distance = None
         else:
             layer_name = data["name"]
             opacity = data.get("opacity", 100)
             blend_mode = data.get("blend_mode", "normal")
             export_mode = data.get("export_mode", "composite")
             lod_mode = data.get("lod_mode", "all_zooms")
-            selected_zooms = set(data.get("selected_zooms", []))
+            selected_zooms_mask = zooms_to_mask(data.get("selected_zooms", []))
             enabled = data.get("enabled", True)
+            max_resample_distance = data.get("max_resample_distance")
 
         if layer_name not in layer_registry:
             raise ValueError(f"Unknown layer: {layer_name}. Valid layers: {', '.join(layer_registry.keys())}")
@@ -210,10 +388,35 @@ class LayerComposition:
             blend_mode=blend_mode,
             export_mode=export_mode,
             lod_mode=lod_mode,
-            selected_zooms=selected_zooms,
+            selected_zooms_mask=selected_zooms_mask,
             enabled=enabled,
+            max_resample_distance=max_resample_distance,
         )
 
+    @classmethod
+    def from_dict_many(
+        cls, items: list[str | dict[str, Any]], layer_registry: dict[str, LayerConfig] | None = None
+    ) -> list["LayerComposition"]:
+        """
+        Create compositions for a list of layer specifications.
+
+        Resolves the layer registry once for the whole list rather than per item.
+
+        Args:
+            items: Layer specifications as accepted by from_dict()
+            layer_registry: Optional custom layer registry to use instead of default LAYERS
+
+        Returns:
+            List of LayerComposition instances, in the same order as items
+
+        Raises:
+            ValueError: If any layer name is not found in layer registry
+        """
+        if layer_registry is None:
+            layer_registry = LAYERS
+
+        return [cls.from_dict(item, layer_registry) for item in items]
+
     def copy(self) -> "LayerComposition":
         """
         Create a copy of this layer composition.
@@ -222,7 +425,7 @@ class LayerComposition:
             New LayerComposition instance with same values
 
         Note:
-            LayerConfig is immutable (frozen), so shallow copy is safe
-            selected_zooms set is explicitly copied to avoid shared references
+            LayerConfig is immutable (frozen) and selected zooms are an int bitmask,
+            so a shallow copy shares no mutable state
         """
-        return replace(self, selected_zooms=self.selected_zooms.copy())
+        return replace(self)
@@ -1,7 +1,8 @@
-"""Protocol for output format handlers."""
+"""Base class for output format handlers."""
 
+from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import TYPE_CHECKING, Protocol
+from typing import TYPE_CHECKING, Generic, TypeVar
 
 from src.models.extent import Extent
 from src.models.layer_composition import LayerComposition
@@ -10,15 +11,20 @@ if TYPE_CHECKING:
     from src.models.extent_config import ExtentConfig
     from src.models.outputs import OutputUnion
 
+# Output configuration model handled by a concrete handler
+OutputT = TypeVar("OutputT", bound="OutputUnion")
 
-class OutputHandler(Protocol):
-    """Protocol defining the interface for output format handlers.
 
-    Each output format (KMZ, GeoTIFF, MBTiles, etc.) should implement this protocol
-    to integrate with the generation system.
+class OutputHandler(ABC, Generic[OutputT]):
+    """Abstract base class defining the interface for output format handlers.
+
+    Each output format (KMZ, GeoTIFF, MBTiles, etc.) should subclass this, parameterized
+    with its output configuration model (e.g. OutputHandler[KMZOutput]), and implement
+    every method to integrate with the generation system.
     """
 
     @staticmethod
+    @abstractmethod
     def get_type_name() -> str:
         """Get the unique type identifier for this output format.
 
@@ -28,6 +34,7 @@ class OutputHandler(Protocol):
         ...
 
     @staticmethod
+    @abstractmethod
     def get_display_name() -> str:
         """Get the human-readable display name for this output format.
 
@@ -37,6 +44,7 @@ class OutputHandler(Protocol):
         ...
 
     @staticmethod
+    @abstractmethod
     def get_file_extension() -> str:
         """Get the default file extension for this output format.
 
@@ -46,6 +54,7 @@ class OutputHandler(Protocol):
         ...
 
     @staticmethod
+    @abstractmethod
     def get_file_filter() -> str:
         """Get the file filter string for file dialogs.
 
@@ -54,6 +63,7 @@ class OutputHandler(Protocol):
         """
         ...
 
+    @abstractmethod
     def generate(
         self,
         output_path: Path,
@@ -61,7 +71,7 @@ class OutputHandler(Protocol):
         min_zoom: int,
         max_zoom: int,
         layer_compositions: list[LayerComposition],
-        output: "OutputUnion",
+        output: OutputT,
         progress_callback=None,
         name: str | None = None,
         description: str | None = None,
@@ -93,8 +103,9 @@ class OutputHandler(Protocol):
         """
         ...
 
+    @abstractmethod
     def estimate_tiles(
-        self, extent: Extent, min_zoom: int, max_zoom: int, layer_compositions: list[LayerComposition], output: "OutputUnion"
+        self, extent: Extent, min_zoom: int, max_zoom: int, layer_compositions: list[LayerComposition], output: OutputT
     ) -> dict:
         """Estimate tile count and size for this output.
 
@@ -115,6 +126,7 @@ class OutputHandler(Protocol):
         ...
 
     @staticmethod
+    @abstractmethod
     def get_default_options() -> dict:
         """Get default format-specific options.
 
@@ -124,6 +136,7 @@ class OutputHandler(Protocol):
         ...
 
     @staticmethod
+    @abstractmethod
     def validate_options(options: dict) -> None:
         """Validate format-specific options.
 
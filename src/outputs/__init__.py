@@ -1,19 +1,34 @@
 """Output format handlers registry."""
 
+from collections.abc import Callable
+
+from src.models.extent import Extent
+from src.models.layer_composition import LayerComposition
 from src.models.output_handler import OutputHandler
+from src.models.outputs import OutputUnion
 from src.outputs.geotiff_output_handler import GeoTIFFOutputHandler
 from src.outputs.kmz_output_handler import KMZOutputHandler
 from src.outputs.mbtiles_output_handler import MBTilesOutputHandler
+from src.utils.lru_cache import LRUCache
 
-# Registry of available output handlers
-OUTPUT_HANDLERS: dict[str, type[OutputHandler]] = {
-    "kmz": KMZOutputHandler,
-    "mbtiles": MBTilesOutputHandler,
-    "geotiff": GeoTIFFOutputHandler,
+# Registry of available output handlers. Handlers are stateless, so a single
+# shared instance per type is created at import time.
+OUTPUT_HANDLERS: dict[str, OutputHandler] = {
+    "kmz": KMZOutputHandler(),
+    "mbtiles": MBTilesOutputHandler(),
+    "geotiff": GeoTIFFOutputHandler(),
     # Future formats can be added here:
-    # "png": PNGOutputHandler,
+    # "png": PNGOutputHandler(),
 }
 
+# Estimate functions resolved once, so live estimate updates skip handler lookup
+_ESTIMATE: dict[str, Callable[..., dict]] = {name: handler.estimate_tiles for name, handler in OUTPUT_HANDLERS.items()}
+
+# Memoized estimates. Option widgets re-estimate on every slider tick and option
+# change, mostly with unchanged inputs.
+ESTIMATE_CACHE_SIZE = 256
+_estimate_cache: LRUCache[tuple, dict] = LRUCache(ESTIMATE_CACHE_SIZE)
+
 
 def get_output_handler(output_type: str) -> OutputHandler:
     """Get an output handler instance for the given type.
@@ -22,18 +37,18 @@ def get_output_handler(output_type: str) -> OutputHandler:
         output_type: Output type name (e.g., "kmz", "geotiff")
 
     Returns:
-        Instance of the output handler
+        Shared instance of the output handler
 
     Raises:
         ValueError: If output type is not supported
     """
-    if output_type not in OUTPUT_HANDLERS:
+    handler = OUTPUT_HANDLERS.get(output_type)
+    if handler is None:
         raise ValueError(
             f"Unsupported output type: {output_type}. Supported types: {', '.join(OUTPUT_HANDLERS.keys())}"
         )
 
-    handler_class = OUTPUT_HANDLERS[output_type]
-    return handler_class()
+    return handler
 
 
 def get_available_output_types() -> list[tuple[str, str]]:
@@ -42,14 +57,66 @@ def get_available_output_types() -> list[tuple[str, str]]:
     Returns:
         List of (type_name, display_name) tuples
     """
-    return [
-        (handler_class.get_type_name(), handler_class.get_display_name()) for handler_class in OUTPUT_HANDLERS.values()
-    ]
+    return [(handler.get_type_name(), handler.get_display_name()) for handler in OUTPUT_HANDLERS.values()]
+
+
+def estimate_tiles(
+    output_type: str,
+    extent: Extent,
+    min_zoom: int,
+    max_zoom: int,
+    layer_compositions: list[LayerComposition],
+    output: OutputUnion,
+) -> dict:
+    """Estimate tile count and size for an output type.
+
+    Args:
+        output_type: Output type name (e.g., "kmz", "geotiff")
+        extent: Geographic extent
+        min_zoom: Minimum zoom level
+        max_zoom: Maximum zoom level
+        layer_compositions: List of layer compositions
+        output: Output configuration model for the given type
+
+    Returns:
+        Estimation dictionary as returned by the handler's estimate_tiles().
+        Results are memoized on the extent, zoom range, enabled layer settings
+        and output configuration.
+
+    Raises:
+        ValueError: If output type is not supported
+    """
+    estimate = _ESTIMATE.get(output_type)
+    if estimate is None:
+        raise ValueError(
+            f"Unsupported output type: {output_type}. Supported types: {', '.join(OUTPUT_HANDLERS.keys())}"
+        )
+
+    cache_key = (
+        output_type,
+        extent.min_lon,
+        extent.min_lat,
+        extent.max_lon,
+        extent.max_lat,
+        min_zoom,
+        max_zoom,
+        tuple(comp.signature() for comp in layer_compositions if comp.enabled),
+        output.model_dump_json(),
+    )
+    cached = _estimate_cache.get(cache_key)
+    if cached is not None:
+        # Copy so callers can't mutate the cached estimate
+        return dict(cached)
+
+    result = estimate(extent, min_zoom, max_zoom, layer_compositions, output)
+    _estimate_cache.put(cache_key, result)
+    return dict(result)
 
 
 __all__ = [
     "OUTPUT_HANDLERS",
     "get_output_handler",
+    "estimate_tiles",
     "get_available_output_types",
     "KMZOutputHandler",
     "MBTilesOutputHandler",
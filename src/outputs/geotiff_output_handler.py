@@ -4,20 +4,48 @@ import asyncio
 import logging
 from pathlib import Path
 
-from src.core.geotiff_generator import GeoTIFFGenerator
+from src.core.geotiff_generator import OUTPUT_FORMAT_VERSION, GeoTIFFGenerator
 from src.core.tile_calculator import TileCalculator
+from src.gui.tile_compositor import TileCompositor
 from src.models.extent import Extent
 from src.models.layer_composition import LayerComposition
+from src.models.output_handler import OutputHandler
 from src.models.outputs import GeoTIFFOutput
 from src.utils.attribution import build_attribution_from_layers
+from src.utils.event_loop import gather_or_cancel, run_async
+from src.utils.progress import CombinedLayerProgress
+from src.utils.sidecar import compute_output_key, is_output_current, remove_output_key, write_output_key
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of layer files generated concurrently in separate mode
+MAX_PARALLEL_LAYERS = 4
 
-class GeoTIFFOutputHandler:
+# Accepted values for enumerated options
+_VALID_COMPRESSIONS = frozenset({"lzw", "deflate", "jpeg", "none"})
+_VALID_EXPORT_MODES = frozenset({"composite", "separate"})
+_VALID_TILE_SIZES = frozenset({256, 512})
+
+# Compression ratios (approximate for aerial imagery)
+_COMPRESSION_RATIOS = {
+    "none": 1.0,  # No compression
+    "lzw": 0.4,  # 40% of original
+    "deflate": 0.35,  # 35% of original (better than LZW)
+    "jpeg": 0.15,  # 15% of original (lossy)
+}
+
+# Estimated stored bytes per 256x256 tile for each compression.
+# RGBA = 4 channels for PNG/LZW/DEFLATE, RGB = 3 channels for JPEG
+_COMPRESSED_TILE_BYTES = {
+    compression: 256 * 256 * (3 if compression == "jpeg" else 4) * ratio
+    for compression, ratio in _COMPRESSION_RATIOS.items()
+}
+
+
+class GeoTIFFOutputHandler(OutputHandler[GeoTIFFOutput]):
     """Handler for GeoTIFF output format.
 
-    Implements the OutputHandler protocol for generating GeoTIFF files with
+    Implements the OutputHandler interface for generating GeoTIFF files with
     optional pyramids, compression, and both composite and separate layer export modes.
     """
 
@@ -63,10 +91,10 @@ class GeoTIFFOutputHandler:
         Raises:
             ValueError: If options are invalid
         """
-        if "compression" in options and options["compression"] not in ["lzw", "deflate", "jpeg", "none"]:
+        if "compression" in options and options["compression"] not in _VALID_COMPRESSIONS:
             raise ValueError("compression must be 'lzw', 'deflate', 'jpeg', or 'none'")
 
-        if "export_mode" in options and options["export_mode"] not in ["composite", "separate"]:
+        if "export_mode" in options and options["export_mode"] not in _VALID_EXPORT_MODES:
             raise ValueError("export_mode must be 'composite' or 'separate'")
 
         if "multi_zoom" in options and not isinstance(options["multi_zoom"], bool):
@@ -80,7 +108,7 @@ class GeoTIFFOutputHandler:
         if "tiled" in options and not isinstance(options["tiled"], bool):
             raise ValueError("tiled must be a boolean")
 
-        if "tile_size" in options and options["tile_size"] not in [256, 512]:
+        if "tile_size" in options and options["tile_size"] not in _VALID_TILE_SIZES:
             raise ValueError("tile_size must be 256 or 512")
 
     def generate(
@@ -117,13 +145,16 @@ class GeoTIFFOutputHandler:
         """
         export_mode = output.export_mode or "composite"
 
+        # Filter to enabled layers once for both generation paths
+        enabled_layers = [comp for comp in layer_compositions if comp.enabled]
+
         if export_mode == "composite":
             return self._generate_composite(
                 output_path,
                 extent,
                 min_zoom,
                 max_zoom,
-                layer_compositions,
+                enabled_layers,
                 output,
                 progress_callback,
                 attribution,
@@ -134,7 +165,7 @@ class GeoTIFFOutputHandler:
                 extent,
                 min_zoom,
                 max_zoom,
-                layer_compositions,
+                enabled_layers,
                 output,
                 progress_callback,
                 attribution,
@@ -167,7 +198,7 @@ class GeoTIFFOutputHandler:
         extent: Extent,
         min_zoom: int,
         max_zoom: int,
-        layer_compositions: list[LayerComposition],
+        enabled_layers: list[LayerComposition],
         output: GeoTIFFOutput,
         progress_callback,
         attribution: str | None = None,
@@ -179,28 +210,24 @@ class GeoTIFFOutputHandler:
             extent: Geographic extent
             min_zoom: Minimum zoom level
             max_zoom: Maximum zoom level
-            layer_compositions: List of layer compositions
+            enabled_layers: Enabled layer compositions
+            output: GeoTIFF output configuration
             progress_callback: Progress callback function
             attribution: Attribution text
-            **options: GeoTIFF options
 
         Returns:
             Path to created GeoTIFF file
         """
         # Remove existing file if it exists
-        if output_path.exists():
-            output_path.unlink()
+        output_path.unlink(missing_ok=True)
 
         generator = GeoTIFFGenerator(output_path, progress_callback)
 
-        # Filter to enabled layers only
-        enabled_layers = [comp for comp in layer_compositions if comp.enabled]
-
         # Build attribution (auto-generate from layers if not provided)
         final_attribution = self._build_attribution(enabled_layers, attribution)
 
         # Run async generation
-        return asyncio.run(
+        return run_async(
             generator.generate_geotiff(
                 extent,
                 min_zoom,
@@ -221,7 +248,7 @@ class GeoTIFFOutputHandler:
         extent: Extent,
         min_zoom: int,
         max_zoom: int,
-        layer_compositions: list[LayerComposition],
+        enabled_layers: list[LayerComposition],
         output: GeoTIFFOutput,
         progress_callback,
         attribution: str | None = None,
@@ -233,10 +260,10 @@ class GeoTIFFOutputHandler:
             extent: Geographic extent
             min_zoom: Minimum zoom level
             max_zoom: Maximum zoom level
-            layer_compositions: List of layer compositions
+            enabled_layers: Enabled layer compositions
+            output: GeoTIFF output configuration
             progress_callback: Progress callback function
             attribution: Attribution text
-            **options: GeoTIFF options
 
         Returns:
             Path to first created GeoTIFF file
@@ -244,10 +271,17 @@ class GeoTIFFOutputHandler:
         base_name = output_path.stem
         parent_dir = output_path.parent
 
-        enabled_layers = [comp for comp in layer_compositions if comp.enabled]
-        generated_files = []
+        # Output settings that affect file content (the path is implied by the file location)
+        output_options = output.model_dump_json(exclude={"path"})
+
+        # Layers run concurrently, so report their tiles as one combined count
+        progress = (
+            CombinedLayerProgress(progress_callback, len(enabled_layers)) if progress_callback is not None else None
+        )
 
-        for idx, layer_comp in enumerate(enabled_layers):
+        async def run_layer(
+            idx: int, layer_comp: LayerComposition, semaphore: asyncio.Semaphore, compositor: TileCompositor
+        ) -> Path:
             layer_id = layer_comp.layer_config.name
 
             # Build file path: {base_name}_{layer_id}.tif
@@ -256,27 +290,36 @@ class GeoTIFFOutputHandler:
             # Build attribution for this specific layer
             layer_attribution = self._build_attribution([layer_comp], attribution)
 
-            # Remove existing file if it exists
-            if layer_output.exists():
-                layer_output.unlink()
-
-            # Wrap progress callback for multi-layer tracking
-            def make_layer_progress(layer_idx, layer_name):
-                def layer_progress(current, total, message):
-                    if progress_callback:
-                        progress_callback(
-                            current,
-                            total,
-                            f"Layer {layer_idx + 1}/{len(enabled_layers)} ({layer_name}): {message}",
-                        )
-
-                return layer_progress
-
-            generator = GeoTIFFGenerator(layer_output, make_layer_progress(idx, layer_id))
-
-            # Run async generation
-            asyncio.run(
-                generator.generate_geotiff(
+            # Skip layers whose file was already generated from identical inputs
+            output_key = compute_output_key(
+                OUTPUT_FORMAT_VERSION,
+                extent,
+                min_zoom,
+                max_zoom,
+                layer_comp.signature(),
+                output_options,
+                layer_attribution,
+            )
+            if is_output_current(layer_output, output_key):
+                logger.info(f"Reusing up-to-date layer file (inputs unchanged): {layer_output}")
+                if progress is not None:
+                    progress.skip_layer(idx)
+                return layer_output
+
+            # Remove existing file and its sidecar if they exist
+            remove_output_key(layer_output)
+            layer_output.unlink(missing_ok=True)
+
+            async with semaphore:
+                # Failed fetches are counted by the shared compositor, so this also sees other
+                # layers' failures while they overlap; regenerating those too is harmless
+                failures_before = compositor.failed_fetches
+                generator = GeoTIFFGenerator(
+                    layer_output,
+                    progress.layer_callback(idx, layer_id) if progress is not None else None,
+                    compositor=compositor,
+                )
+                await generator.generate_geotiff(
                     extent,
                     min_zoom,
                     max_zoom,
@@ -288,10 +331,33 @@ class GeoTIFFOutputHandler:
                     tile_size=output.tile_size or 256,
                     attribution=layer_attribution,
                 )
-            )
 
-            generated_files.append(layer_output)
+            # Don't record files containing placeholders for failed fetches as up to date,
+            # so the next run regenerates them
+            if compositor.failed_fetches > failures_before:
+                logger.warning(f"Tiles failed to fetch, layer file will be regenerated next run: {layer_output}")
+            else:
+                write_output_key(layer_output, output_key)
             logger.info(f"Generated layer file: {layer_output}")
+            return layer_output
+
+        async def run_all_layers() -> list[Path]:
+            # Layers are independent, so overlap their tile fetching in one event loop,
+            # sharing one compositor so all layers reuse the same HTTP session. If a layer
+            # fails the others are cancelled before the session is closed
+            semaphore = asyncio.Semaphore(MAX_PARALLEL_LAYERS)
+            compositor = TileCompositor()
+            try:
+                return await gather_or_cancel(
+                    *(
+                        run_layer(idx, layer_comp, semaphore, compositor)
+                        for idx, layer_comp in enumerate(enabled_layers)
+                    )
+                )
+            finally:
+                await compositor.close()
+
+        generated_files = run_async(run_all_layers())
 
         return generated_files[0] if generated_files else output_path
 
@@ -305,10 +371,10 @@ class GeoTIFFOutputHandler:
             min_zoom: Minimum zoom level
             max_zoom: Maximum zoom level
             layer_compositions: List of layer compositions
-            **options: GeoTIFF-specific options:
-                - compression (str): "lzw", "deflate", "jpeg", or "none"
-                - export_mode (str): "composite" or "separate"
-                - multi_zoom (bool): Include pyramids
+            output: GeoTIFF output configuration. Uses:
+                - compression: "lzw", "deflate", "jpeg", or "none"
+                - export_mode: "composite" or "separate"
+                - multi_zoom: Include pyramids
 
         Returns:
             Dictionary with estimation data:
@@ -317,8 +383,8 @@ class GeoTIFFOutputHandler:
                 - size_bytes (int): Estimated size in bytes
                 - size_label (str): Display string for size
         """
-        enabled_layers = [comp for comp in layer_compositions if comp.enabled]
-        if not enabled_layers:
+        enabled_count = sum(comp.enabled for comp in layer_compositions)
+        if not enabled_count:
             return {
                 "count": 0,
                 "count_label": "Tiles: -",
@@ -331,37 +397,29 @@ class GeoTIFFOutputHandler:
             extent.min_lon, extent.min_lat, extent.max_lon, extent.max_lat, max_zoom
         )
 
-        # Compression ratios (approximate for aerial imagery)
+        # Estimated compressed size of one tile
         compression = output.compression or "lzw"
-        compression_ratios = {
-            "none": 1.0,  # No compression
-            "lzw": 0.4,  # 40% of original
-            "deflate": 0.35,  # 35% of original (better than LZW)
-            "jpeg": 0.15,  # 15% of original (lossy)
-        }
-
-        # Base tile size: 256x256 pixels * channels * bytes_per_channel
-        # RGBA = 4 channels for PNG/LZW/DEFLATE, RGB = 3 channels for JPEG
-        channels = 3 if compression == "jpeg" else 4
-        base_tile_bytes = 256 * 256 * channels
-
-        # Apply compression ratio
-        compressed_tile_bytes = base_tile_bytes * compression_ratios[compression]
+        compressed_tile_bytes = _COMPRESSED_TILE_BYTES[compression]
 
         # Calculate base raster size
         base_size = max_zoom_tiles * compressed_tile_bytes
 
         # Add pyramid overhead if multi_zoom enabled
         multi_zoom = output.multi_zoom if output.multi_zoom is not None else True
-        # Pyramids add approximately 1/3 additional size (1/4 + 1/16 + 1/64 + ... ≈ 1/3 of base size)
-        pyramid_overhead = 1.33 if multi_zoom and min_zoom < max_zoom else 1.0
+        # Each overview level has 1/4 the pixels of the one above it, so base + overviews is the
+        # finite geometric series 1 + 1/4 + ... + 1/4^(levels-1) = (1 - 0.25^levels) / 0.75
+        if multi_zoom and min_zoom < max_zoom:
+            zoom_levels = max_zoom - min_zoom + 1
+            pyramid_overhead = (1 - 0.25**zoom_levels) / 0.75
+        else:
+            pyramid_overhead = 1.0
 
         total_size = base_size * pyramid_overhead
 
         # Account for export mode
         export_mode = output.export_mode or "composite"
         if export_mode == "separate":
-            file_count = len(enabled_layers)
+            file_count = enabled_count
             total_size *= file_count
             size_label_suffix = f" ({file_count} files)"
         else:
@@ -376,9 +434,10 @@ class GeoTIFFOutputHandler:
 
         # Calculate total tiles across all zooms (for display)
         if multi_zoom and min_zoom < max_zoom:
-            total_tiles = sum(
-                TileCalculator.estimate_tile_count(extent.min_lon, extent.min_lat, extent.max_lon, extent.max_lat, zoom)
-                for zoom in range(min_zoom, max_zoom + 1)
+            total_tiles = int(
+                TileCalculator.estimate_tile_counts_range(
+                    extent.min_lon, extent.min_lat, extent.max_lon, extent.max_lat, min_zoom, max_zoom
+                ).sum()
             )
             zoom_levels = max_zoom - min_zoom + 1
             count_label = f"Tiles: {total_tiles:,} ({zoom_levels} zoom levels)"
@@ -6,13 +6,20 @@ from src.core.kmz_generator import KMZGenerator
 from src.core.tile_calculator import CHUNK_SIZE, TileCalculator
 from src.models.extent import Extent
 from src.models.layer_composition import LayerComposition
+from src.models.output_handler import OutputHandler
 from src.models.outputs import KMZOutput
 
+# Estimated web compatible chunk size: CHUNK_SIZE^2 tiles per chunk, ~6KB per tile after compression
+_AVG_CHUNK_BYTES = (CHUNK_SIZE**2) * 6 * 1024
 
-class KMZOutputHandler:
+# Accepted values for attribution_mode
+_VALID_ATTRIBUTION_MODES = frozenset({"description", "overlay"})
+
+
+class KMZOutputHandler(OutputHandler[KMZOutput]):
     """Handler for KMZ (Google Earth) output format.
 
-    Implements the OutputHandler protocol for generating KMZ files.
+    Implements the OutputHandler interface for generating KMZ files.
     """
 
     @staticmethod
@@ -125,9 +132,8 @@ class KMZOutputHandler:
             Dictionary with estimation data
         """
         web_compatible = output.web_compatible or False
-        enabled_layers = [comp for comp in layer_compositions if comp.enabled]
 
-        if not enabled_layers:
+        if not any(comp.enabled for comp in layer_compositions):
             return {
                 "count": 0,
                 "count_label": "Tiles: -",
@@ -148,9 +154,7 @@ class KMZOutputHandler:
             )
 
             # Estimate size
-            # CHUNK_SIZE^2 tiles per chunk, ~6KB per tile after compression
-            avg_chunk_size_kb = (CHUNK_SIZE**2) * 6
-            size_bytes = chunk_count * avg_chunk_size_kb * 1024
+            size_bytes = chunk_count * _AVG_CHUNK_BYTES
             size_mb = size_bytes / (1024 * 1024)
 
             return {
@@ -161,12 +165,11 @@ class KMZOutputHandler:
             }
         else:
             # Regular mode: calculate tiles
-            total_tiles = 0
-            for zoom in range(min_zoom, max_zoom + 1):
-                tile_count = TileCalculator.estimate_tile_count(
-                    extent.min_lon, extent.min_lat, extent.max_lon, extent.max_lat, zoom
-                )
-                total_tiles += tile_count
+            total_tiles = int(
+                TileCalculator.estimate_tile_counts_range(
+                    extent.min_lon, extent.min_lat, extent.max_lon, extent.max_lat, min_zoom, max_zoom
+                ).sum()
+            )
 
             # Format count label
             zoom_levels = max_zoom - min_zoom + 1
@@ -214,7 +217,7 @@ class KMZOutputHandler:
         if "include_timestamp" in options and not isinstance(options["include_timestamp"], bool):
             raise ValueError("include_timestamp must be a boolean")
 
-        if "attribution_mode" in options and options["attribution_mode"] not in ["description", "overlay"]:
+        if "attribution_mode" in options and options["attribution_mode"] not in _VALID_ATTRIBUTION_MODES:
             raise ValueError("attribution_mode must be 'description' or 'overlay'")
 
         if "merge_extent_kml" in options and not isinstance(options["merge_extent_kml"], bool):
@@ -4,20 +4,33 @@ import asyncio
 import logging
 from pathlib import Path
 
-from src.core.mbtiles_generator import MBTilesGenerator
+from src.core.mbtiles_generator import OUTPUT_FORMAT_VERSION, MBTilesGenerator
 from src.core.tile_calculator import TileCalculator
+from src.gui.tile_compositor import TileCompositor
 from src.models.extent import Extent
 from src.models.layer_composition import LayerComposition
+from src.models.output_handler import OutputHandler
 from src.models.outputs import MBTilesOutput
 from src.utils.attribution import build_attribution_from_layers
+from src.utils.event_loop import gather_or_cancel, run_async
+from src.utils.progress import CombinedLayerProgress
+from src.utils.sidecar import compute_output_key, is_output_current, remove_output_key, write_output_key
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of layer files generated concurrently in separate mode
+MAX_PARALLEL_LAYERS = 4
 
-class MBTilesOutputHandler:
+# Accepted values for enumerated options
+_VALID_IMAGE_FORMATS = frozenset({"png", "jpg"})
+_VALID_EXPORT_MODES = frozenset({"composite", "separate"})
+_VALID_METADATA_TYPES = frozenset({"overlay", "baselayer"})
+
+
+class MBTilesOutputHandler(OutputHandler[MBTilesOutput]):
     """Handler for MBTiles output format.
 
-    Implements the OutputHandler protocol for generating MBTiles databases.
+    Implements the OutputHandler interface for generating MBTiles databases.
     Supports both PNG and JPEG image formats, and both composite and separate
     layer export modes.
     """
@@ -63,10 +76,10 @@ class MBTilesOutputHandler:
         Raises:
             ValueError: If options are invalid
         """
-        if "image_format" in options and options["image_format"] not in ["png", "jpg"]:
+        if "image_format" in options and options["image_format"] not in _VALID_IMAGE_FORMATS:
             raise ValueError("image_format must be 'png' or 'jpg'")
 
-        if "export_mode" in options and options["export_mode"] not in ["composite", "separate"]:
+        if "export_mode" in options and options["export_mode"] not in _VALID_EXPORT_MODES:
             raise ValueError("export_mode must be 'composite' or 'separate'")
 
         if "jpeg_quality" in options:
@@ -74,7 +87,7 @@ class MBTilesOutputHandler:
             if not isinstance(quality, int) or not 1 <= quality <= 100:
                 raise ValueError("jpeg_quality must be an integer between 1 and 100")
 
-        if "metadata_type" in options and options["metadata_type"] not in ["overlay", "baselayer"]:
+        if "metadata_type" in options and options["metadata_type"] not in _VALID_METADATA_TYPES:
             raise ValueError("metadata_type must be 'overlay' or 'baselayer'")
 
     def generate(
@@ -111,13 +124,16 @@ class MBTilesOutputHandler:
         """
         export_mode = output.export_mode or "composite"
 
+        # Filter to enabled layers once for both generation paths
+        enabled_layers = [comp for comp in layer_compositions if comp.enabled]
+
         if export_mode == "composite":
             return self._generate_composite(
                 output_path,
                 extent,
                 min_zoom,
                 max_zoom,
-                layer_compositions,
+                enabled_layers,
                 output,
                 progress_callback,
                 name,
@@ -130,7 +146,7 @@ class MBTilesOutputHandler:
                 extent,
                 min_zoom,
                 max_zoom,
-                layer_compositions,
+                enabled_layers,
                 output,
                 progress_callback,
                 name,
@@ -165,7 +181,7 @@ class MBTilesOutputHandler:
         extent: Extent,
         min_zoom: int,
         max_zoom: int,
-        layer_compositions: list[LayerComposition],
+        enabled_layers: list[LayerComposition],
         output: MBTilesOutput,
         progress_callback,
         name: str | None = None,
@@ -179,7 +195,7 @@ class MBTilesOutputHandler:
             extent: Geographic extent
             min_zoom: Minimum zoom level
             max_zoom: Maximum zoom level
-            layer_compositions: List of layer compositions
+            enabled_layers: Enabled layer compositions
             output: MBTiles output configuration
             progress_callback: Progress callback function
 
@@ -187,14 +203,10 @@ class MBTilesOutputHandler:
             Path to created MBTiles file
         """
         # Remove existing file if it exists
-        if output_path.exists():
-            output_path.unlink()
+        output_path.unlink(missing_ok=True)
 
         generator = MBTilesGenerator(output_path, progress_callback)
 
-        # Filter to enabled layers only
-        enabled_layers = [comp for comp in layer_compositions if comp.enabled]
-
         # Build attribution (auto-generate from layers if not provided)
         final_attribution = self._build_attribution(enabled_layers, attribution or "")
 
@@ -206,7 +218,7 @@ class MBTilesOutputHandler:
         }
 
         # Run async generation (Python 3.14 compatible)
-        return asyncio.run(
+        return run_async(
             generator.generate_mbtiles(
                 extent,
                 min_zoom,
@@ -224,7 +236,7 @@ class MBTilesOutputHandler:
         extent: Extent,
         min_zoom: int,
         max_zoom: int,
-        layer_compositions: list[LayerComposition],
+        enabled_layers: list[LayerComposition],
         output: MBTilesOutput,
         progress_callback,
         name: str | None = None,
@@ -238,7 +250,7 @@ class MBTilesOutputHandler:
             extent: Geographic extent
             min_zoom: Minimum zoom level
             max_zoom: Maximum zoom level
-            layer_compositions: List of layer compositions
+            enabled_layers: Enabled layer compositions
             progress_callback: Progress callback function
             output: MBTiles output configuration
 
@@ -248,10 +260,24 @@ class MBTilesOutputHandler:
         base_name = output_path.stem
         parent_dir = output_path.parent
 
-        enabled_layers = [comp for comp in layer_compositions if comp.enabled]
-        generated_files = []
+        # Output settings that affect file content (the path is implied by the file location)
+        output_options = output.model_dump_json(exclude={"path"})
+
+        # Settings shared by every layer file
+        metadata_name = name or "Tile Export"
+        metadata_description = description or ""
+        metadata_type = output.metadata_type or "overlay"
+        image_format = output.image_format or "png"
+        jpeg_quality = output.jpeg_quality or 80
 
-        for idx, layer_comp in enumerate(enabled_layers):
+        # Layers run concurrently, so report their tiles as one combined count
+        progress = (
+            CombinedLayerProgress(progress_callback, len(enabled_layers)) if progress_callback is not None else None
+        )
+
+        async def run_layer(
+            idx: int, layer_comp: LayerComposition, semaphore: asyncio.Semaphore, compositor: TileCompositor
+        ) -> Path:
             layer_id = layer_comp.layer_config.name
 
             # Build file path: {base_name}_{layer_id}.mbtiles
@@ -261,45 +287,78 @@ class MBTilesOutputHandler:
             layer_attribution = self._build_attribution([layer_comp], attribution or "")
 
             # Update metadata name to include layer
-            metadata_name = name or "Tile Export"
             layer_metadata = {
                 "name": f"{metadata_name} - {layer_id}",
-                "description": description or "",
+                "description": metadata_description,
                 "attribution": layer_attribution,
-                "type": output.metadata_type or "overlay",
+                "type": metadata_type,
             }
 
-            # Remove existing file if it exists
-            if layer_output.exists():
-                layer_output.unlink()
-
-            # Wrap progress callback for multi-layer tracking (bind loop variables)
-            def make_layer_progress(layer_idx, layer_name):
-                def layer_progress(current, total, message):
-                    if progress_callback:
-                        progress_callback(
-                            current, total, f"Layer {layer_idx + 1}/{len(enabled_layers)} ({layer_name}): {message}"
-                        )
-
-                return layer_progress
-
-            generator = MBTilesGenerator(layer_output, make_layer_progress(idx, layer_id))
-
-            # Run async generation (Python 3.14 compatible)
-            asyncio.run(
-                generator.generate_mbtiles(
+            # Skip layers whose file was already generated from identical inputs
+            output_key = compute_output_key(
+                OUTPUT_FORMAT_VERSION,
+                extent,
+                min_zoom,
+                max_zoom,
+                layer_comp.signature(),
+                output_options,
+                layer_metadata,
+            )
+            if is_output_current(layer_output, output_key):
+                logger.info(f"Reusing up-to-date layer file (inputs unchanged): {layer_output}")
+                if progress is not None:
+                    progress.skip_layer(idx)
+                return layer_output
+
+            # Remove existing file and its sidecar if they exist
+            remove_output_key(layer_output)
+            layer_output.unlink(missing_ok=True)
+
+            async with semaphore:
+                # Failed fetches are counted by the shared compositor, so this also sees other
+                # layers' failures while they overlap; regenerating those too is harmless
+                failures_before = compositor.failed_fetches
+                generator = MBTilesGenerator(
+                    layer_output,
+                    progress.layer_callback(idx, layer_id) if progress is not None else None,
+                    compositor=compositor,
+                )
+                await generator.generate_mbtiles(
                     extent,
                     min_zoom,
                     max_zoom,
                     [layer_comp],
-                    output.image_format or "png",
+                    image_format,
                     layer_metadata,
-                    output.jpeg_quality or 80,
+                    jpeg_quality,
                 )
-            )
 
-            generated_files.append(layer_output)
+            # Don't record files containing placeholders for failed fetches as up to date,
+            # so the next run regenerates them
+            if compositor.failed_fetches > failures_before:
+                logger.warning(f"Tiles failed to fetch, layer file will be regenerated next run: {layer_output}")
+            else:
+                write_output_key(layer_output, output_key)
             logger.info(f"Generated layer file: {layer_output}")
+            return layer_output
+
+        async def run_all_layers() -> list[Path]:
+            # Each layer writes its own database, so overlap their tile fetching in one event
+            # loop, sharing one compositor so all layers reuse the same HTTP session. If a
+            # layer fails the others are cancelled before the session is closed
+            semaphore = asyncio.Semaphore(MAX_PARALLEL_LAYERS)
+            compositor = TileCompositor()
+            try:
+                return await gather_or_cancel(
+                    *(
+                        run_layer(idx, layer_comp, semaphore, compositor)
+                        for idx, layer_comp in enumerate(enabled_layers)
+                    )
+                )
+            finally:
+                await compositor.close()
+
+        generated_files = run_async(run_all_layers())
 
         return generated_files[0] if generated_files else output_path
 
@@ -322,8 +381,8 @@ class MBTilesOutputHandler:
                 - size_bytes (int): Estimated size in bytes
                 - size_label (str): Display string for size
         """
-        enabled_layers = [comp for comp in layer_compositions if comp.enabled]
-        if not enabled_layers:
+        enabled_count = sum(comp.enabled for comp in layer_compositions)
+        if not enabled_count:
             return {
                 "count": 0,
                 "count_label": "Tiles: -",
@@ -332,9 +391,10 @@ class MBTilesOutputHandler:
             }
 
         # Calculate total tiles
-        total_tiles = sum(
-            TileCalculator.estimate_tile_count(extent.min_lon, extent.min_lat, extent.max_lon, extent.max_lat, zoom)
-            for zoom in range(min_zoom, max_zoom + 1)
+        total_tiles = int(
+            TileCalculator.estimate_tile_counts_range(
+                extent.min_lon, extent.min_lat, extent.max_lon, extent.max_lat, min_zoom, max_zoom
+            ).sum()
         )
 
         # Estimate size based on format
@@ -346,7 +406,7 @@ class MBTilesOutputHandler:
         export_mode = output.export_mode or "composite"
         if export_mode == "separate":
             # Multiple files, one per layer
-            file_count = len(enabled_layers)
+            file_count = enabled_count
             total_tiles_all_files = total_tiles * file_count
             size_bytes = total_tiles_all_files * avg_tile_kb * 1024
 
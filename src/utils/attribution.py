@@ -1,5 +1,7 @@
 """Attribution utilities for MBTiles metadata."""
 
+import functools
+
 from src.models.layer_composition import LayerComposition
 
 
@@ -14,14 +16,26 @@ def build_attribution_from_layers(layer_compositions: list[LayerComposition]) ->
     Returns:
         Attribution string with de-duplicated layer attributions joined by "; "
     """
-    attributions = []
-    seen = set()
+    return _join_attributions(
+        tuple(
+            comp.layer_config.attribution
+            for comp in layer_compositions
+            if comp.enabled and comp.layer_config.attribution
+        )
+    )
+
 
-    for comp in layer_compositions:
-        if comp.enabled:
-            attr = comp.layer_config.attribution
-            if attr and attr not in seen:
-                attributions.append(attr)
-                seen.add(attr)
+@functools.lru_cache(maxsize=32)
+def _join_attributions(attributions: tuple[str, ...]) -> str:
+    """De-duplicate attributions, keeping first-seen order, and join them with "; ".
 
-    return "; ".join(attributions) if attributions else ""
+    Memoized on the attribution strings themselves, since the settings panel rebuilds
+    the same attribution on every layer change.
+
+    Args:
+        attributions: Non-empty attribution strings in layer order
+
+    Returns:
+        Joined attribution string, or "" if there are none
+    """
+    return "; ".join(dict.fromkeys(attributions))
@@ -0,0 +1,114 @@
+"""Per-thread event loop for running async generation from synchronous code."""
+
+import asyncio
+import threading
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+# Each thread (CLI main thread, GUI export worker) keeps its own loop
+_thread_state = threading.local()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Get the calling thread's persistent event loop, creating it on first use.
+
+    Returns:
+        Event loop owned by the calling thread
+    """
+    loop = getattr(_thread_state, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        _thread_state.loop = loop
+    return loop
+
+
+def run_async(coro: Coroutine[Any, Any, T]) -> T:
+    """Run a coroutine to completion on the calling thread's persistent event loop.
+
+    Drop-in replacement for asyncio.run() that reuses one loop across calls instead of
+    creating and tearing down a new loop for every output or layer.
+
+    Like asyncio.run(), any tasks the coroutine left pending (e.g. the other branches of a
+    failed gather, or background tasks it never awaited) are cancelled and run to completion
+    when it returns or raises, so their cleanup runs and nothing leaks into the next call.
+
+    Args:
+        coro: Coroutine to run
+
+    Returns:
+        Result of the coroutine
+    """
+    loop = get_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        _cancel_all_tasks(loop)
+
+
+async def gather_or_cancel(*coros: Coroutine[Any, Any, T]) -> list[T]:
+    """Run coroutines concurrently, cancelling the rest as soon as one fails.
+
+    Unlike asyncio.gather(), the remaining tasks are cancelled and awaited before the
+    first exception propagates, so shared resources can be closed safely afterwards.
+    Unlike asyncio.TaskGroup, the original exception is raised rather than an
+    ExceptionGroup.
+
+    Args:
+        *coros: Coroutines to run
+
+    Returns:
+        Results of the coroutines, in order
+    """
+    tasks = [asyncio.ensure_future(coro) for coro in coros]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+def _cancel_all_tasks(loop: asyncio.AbstractEventLoop) -> None:
+    """Cancel every pending task on the loop and wait for them to finish, as asyncio.run() does.
+
+    Args:
+        loop: Event loop whose tasks to cancel
+    """
+    tasks = asyncio.all_tasks(loop)
+    if not tasks:
+        return
+
+    for task in tasks:
+        task.cancel()
+
+    loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+
+    for task in tasks:
+        if not task.cancelled() and task.exception() is not None:
+            loop.call_exception_handler(
+                {
+                    "message": "unhandled exception while cancelling pending tasks",
+                    "exception": task.exception(),
+                    "task": task,
+                }
+            )
+
+
+def close_event_loop() -> None:
+    """Close the calling thread's event loop, if one was created.
+
+    Call this before a worker thread exits so the loop's resources are released. Pending
+    tasks are cancelled and the default executor used by asyncio.to_thread() is shut down.
+    """
+    loop = getattr(_thread_state, "loop", None)
+    if loop is not None and not loop.is_closed():
+        try:
+            _cancel_all_tasks(loop)
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.run_until_complete(loop.shutdown_default_executor())
+        finally:
+            loop.close()
+    _thread_state.loop = None
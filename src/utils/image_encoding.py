@@ -4,6 +4,9 @@ import io
 
 from PIL import Image
 
+# Leading bytes of a JPEG file, used to recognize tiles that are already JPEG
+_JPEG_SIGNATURE = b"\xff\xd8\xff"
+
 
 class ImageEncoder:
     """Utilities for encoding tile images to different formats.
@@ -26,20 +29,35 @@ class ImageEncoder:
         Returns:
             JPEG image bytes
 
+        Raises:
+            ValueError: If quality is not in range 1-100
+        """
+        return ImageEncoder._encode_jpeg(Image.open(io.BytesIO(png_data)), quality)
+
+    @staticmethod
+    def _encode_jpeg(img: Image.Image, quality: int) -> bytes:
+        """Encode an image as JPEG, compositing any transparency onto white.
+
+        Args:
+            img: Image to encode (not modified)
+            quality: JPEG quality 1-100
+
+        Returns:
+            JPEG image bytes
+
         Raises:
             ValueError: If quality is not in range 1-100
         """
         if not 1 <= quality <= 100:
             raise ValueError(f"JPEG quality must be 1-100, got {quality}")
 
-        img = Image.open(io.BytesIO(png_data))
-
         # Convert RGBA to RGB (JPEG doesn't support alpha)
         if img.mode == "RGBA":
             # Create white background
             background = Image.new("RGB", img.size, (255, 255, 255))
-            # Composite using alpha channel as mask
-            background.paste(img, mask=img.split()[3])
+            # Composite using the image itself as mask, which uses its alpha band
+            # directly instead of materializing it with split()
+            background.paste(img, mask=img)
             img = background
         elif img.mode != "RGB":
             # Convert other modes to RGB
@@ -49,15 +67,44 @@ class ImageEncoder:
         img.save(buffer, format="JPEG", quality=quality)
         return buffer.getvalue()
 
+    @staticmethod
+    def encode_image(img: Image.Image, image_format: str, jpeg_quality: int = 80) -> bytes:
+        """Encode a composited tile image to target format.
+
+        Avoids the PNG encode/decode round-trip of encode_tile() when the caller
+        already has the image in memory.
+
+        Args:
+            img: Composited tile image (not modified)
+            image_format: "png" or "jpg"
+            jpeg_quality: JPEG quality if format is jpg (1-100)
+
+        Returns:
+            Encoded image bytes
+
+        Raises:
+            ValueError: If image_format is not supported or jpeg_quality is invalid
+        """
+        if image_format == "png":
+            buffer = io.BytesIO()
+            # Match the compositor's PNG output, which drops source ICC profiles
+            img.save(buffer, format="PNG", icc_profile=None)
+            return buffer.getvalue()
+        elif image_format == "jpg":
+            return ImageEncoder._encode_jpeg(img, jpeg_quality)
+        else:
+            raise ValueError(f"Unsupported image format: {image_format}. Supported: 'png', 'jpg'")
+
     @staticmethod
     def encode_tile(tile_data_png: bytes, image_format: str, jpeg_quality: int = 80) -> bytes:
         """Encode tile to target format.
 
         This is a convenience method that routes to the appropriate encoder
-        based on the requested format.
+        based on the requested format. Input already in the target container is
+        returned unchanged; a JPEG is never re-encoded, which would only lose quality.
 
         Args:
-            tile_data_png: PNG bytes from compositor
+            tile_data_png: PNG bytes from compositor (JPEG bytes are also accepted)
             image_format: "png" or "jpg"
             jpeg_quality: JPEG quality if format is jpg (1-100)
 
@@ -68,9 +115,16 @@ class ImageEncoder:
             ValueError: If image_format is not supported or jpeg_quality is invalid
         """
         if image_format == "png":
+            if tile_data_png.startswith(_JPEG_SIGNATURE):
+                return ImageEncoder.encode_image(Image.open(io.BytesIO(tile_data_png)), "png")
             # PNG passthrough - no conversion needed
             return tile_data_png
         elif image_format == "jpg":
+            if not 1 <= jpeg_quality <= 100:
+                raise ValueError(f"JPEG quality must be 1-100, got {jpeg_quality}")
+            if tile_data_png.startswith(_JPEG_SIGNATURE):
+                # JPEG passthrough - no conversion needed
+                return tile_data_png
             return ImageEncoder.encode_png_to_jpeg(tile_data_png, jpeg_quality)
         else:
             raise ValueError(f"Unsupported image format: {image_format}. Supported: 'png', 'jpg'")
@@ -1,10 +1,11 @@
 """Utility functions for calculating extents from KML files."""
 
-import copy
 import logging
+import math
 import xml.etree.ElementTree as ET
 from pathlib import Path
 
+import numpy as np
 import pyproj
 
 from src.models.extent import Extent
@@ -14,8 +15,57 @@ logger = logging.getLogger(__name__)
 # KML namespace
 KML_NS = {"kml": "http://www.opengis.net/kml/2.2"}
 
+# Namespace-qualified tags matched while streaming
+_COORDINATES_TAG = f"{{{KML_NS['kml']}}}coordinates"
+_DOCUMENT_TAG = f"{{{KML_NS['kml']}}}Document"
+_PLACEMARK_TAG = f"{{{KML_NS['kml']}}}Placemark"
+_NAME_TAG = f"{{{KML_NS['kml']}}}name"
+_DESCRIPTION_TAG = f"{{{KML_NS['kml']}}}description"
 
-def extract_coordinates_from_kml(kml_path: Path) -> list[tuple[float, float]]:
+# Geod is immutable and initializing it goes through PROJ, so share one instance
+_WGS84_GEOD = pyproj.Geod(ellps="WGS84")
+
+# WGS84 ellipsoid: semi-major axis (meters) and first eccentricity squared
+_WGS84_A = _WGS84_GEOD.a
+_WGS84_E2 = _WGS84_GEOD.es
+
+# Paddings up to this distance use the local radii of curvature instead of geodesic
+# solves; the difference is well under a meter at this scale
+_FAST_PADDING_MAX_METERS = 10_000.0
+
+# Beyond this latitude padding may cross a pole, which only the geodesic path handles
+_FAST_PADDING_MAX_LAT = 85.0
+
+
+def _parse_coordinates(text: str) -> np.ndarray:
+    """
+    Parse the text of a KML <coordinates> element.
+
+    Args:
+        text: Whitespace-separated "lon,lat[,alt]" tuples
+
+    Returns:
+        Array of shape (N, 2) with (lon, lat) rows; tuples without both values are skipped
+    """
+    points = text.split()
+    if not points:
+        return np.empty((0, 2))
+
+    try:
+        # Fast path: every tuple has the same number of values, parsed in C
+        values = np.loadtxt(points, delimiter=",", ndmin=2)
+    except ValueError:
+        # Tuples of differing lengths: parse each one
+        pairs = [[float(part) for part in point.split(",")[:2]] for point in points if "," in point]
+        values = np.array(pairs).reshape(-1, 2)
+
+    if values.shape[1] < 2:
+        return np.empty((0, 2))
+
+    return values[:, :2]
+
+
+def extract_coordinates_from_kml(kml_path: Path) -> np.ndarray:
     """
     Extract all coordinate pairs from KML file.
 
@@ -23,7 +73,7 @@ def extract_coordinates_from_kml(kml_path: Path) -> list[tuple[float, float]]:
         kml_path: Path to KML file
 
     Returns:
-        List of (lon, lat) tuples
+        Array of shape (N, 2) with (lon, lat) rows
 
     Raises:
         FileNotFoundError: If KML file doesn't exist
@@ -33,23 +83,18 @@ def extract_coordinates_from_kml(kml_path: Path) -> list[tuple[float, float]]:
         raise FileNotFoundError(f"KML file not found: {kml_path}")
 
     try:
-        tree = ET.parse(kml_path)
-        root = tree.getroot()
+        # Stream all <coordinates> elements, freeing each element once processed so
+        # large tracks never hold the whole document in memory
+        # KML format: "lon,lat,alt lon,lat,alt ..." (space or newline separated)
+        blocks = []
+        for _, elem in ET.iterparse(kml_path, events=("end",)):
+            if elem.tag == _COORDINATES_TAG and elem.text:
+                blocks.append(_parse_coordinates(elem.text))
+            elem.clear()
 
-        coords = []
+        coords = np.vstack(blocks) if blocks else np.empty((0, 2))
 
-        # Find all <coordinates> elements
-        # KML format: "lon,lat,alt lon,lat,alt ..." (space or newline separated)
-        for coord_elem in root.findall(".//kml:coordinates", KML_NS):
-            if coord_elem.text:
-                text = coord_elem.text.strip()
-                for point in text.split():
-                    parts = point.split(",")
-                    if len(parts) >= 2:
-                        lon, lat = float(parts[0]), float(parts[1])
-                        coords.append((lon, lat))
-
-        if not coords:
+        if not len(coords):
             raise ValueError(f"No coordinates found in KML file: {kml_path}")
 
         return coords
@@ -58,24 +103,55 @@ def extract_coordinates_from_kml(kml_path: Path) -> list[tuple[float, float]]:
         raise ValueError(f"Invalid KML file: {e}") from e
 
 
-def calculate_bbox(coords: list[tuple[float, float]]) -> Extent:
+def calculate_bbox(coords: np.ndarray | list[tuple[float, float]]) -> Extent:
     """
-    Calculate bounding box from coordinate list.
+    Calculate bounding box from coordinates.
 
     Args:
-        coords: List of (lon, lat) tuples
+        coords: Array of shape (N, 2) or list of (lon, lat) tuples
 
     Returns:
         Extent representing the bounding box
     """
-    lons = [c[0] for c in coords]
-    lats = [c[1] for c in coords]
+    coords = np.asarray(coords, dtype=np.float64)
+    min_lon, min_lat = coords.min(axis=0)
+    max_lon, max_lat = coords.max(axis=0)
+
+    return Extent(
+        min_lon=float(min_lon),
+        min_lat=float(min_lat),
+        max_lon=float(max_lon),
+        max_lat=float(max_lat),
+    )
+
+
+def _apply_padding_local(extent: Extent, padding_meters: float) -> Extent:
+    """
+    Apply padding using the WGS84 radii of curvature at each side's latitude.
+
+    Args:
+        extent: Original extent
+        padding_meters: Padding distance in meters (uniform on all sides)
+
+    Returns:
+        New extent with padding applied
+    """
+
+    def meridional_radius(lat: float) -> float:
+        sin_lat = math.sin(math.radians(lat))
+        return _WGS84_A * (1 - _WGS84_E2) / (1 - _WGS84_E2 * sin_lat * sin_lat) ** 1.5
+
+    center_lat = (extent.min_lat + extent.max_lat) / 2
+    sin_center = math.sin(math.radians(center_lat))
+    # Radius of the parallel through the center, where the east/west padding is measured
+    parallel_radius = _WGS84_A * math.cos(math.radians(center_lat)) / math.sqrt(1 - _WGS84_E2 * sin_center**2)
+    dlon = math.degrees(padding_meters / parallel_radius)
 
     return Extent(
-        min_lon=min(lons),
-        min_lat=min(lats),
-        max_lon=max(lons),
-        max_lat=max(lats),
+        min_lon=extent.min_lon - dlon,
+        min_lat=extent.min_lat - math.degrees(padding_meters / meridional_radius(extent.min_lat)),
+        max_lon=extent.max_lon + dlon,
+        max_lat=extent.max_lat + math.degrees(padding_meters / meridional_radius(extent.max_lat)),
     )
 
 
@@ -84,7 +160,9 @@ def apply_padding_meters(extent: Extent, padding_meters: float) -> Extent:
     Apply uniform padding in meters to an extent.
 
     Uses WGS84 ellipsoid for accurate meter-to-degree conversion.
-    Padding is applied equally to all four sides.
+    Padding is applied equally to all four sides. Small paddings away from the
+    poles convert meters to degrees using the ellipsoid's local radii of
+    curvature; larger ones solve the geodesic for each side.
 
     Args:
         extent: Original extent
@@ -96,8 +174,13 @@ def apply_padding_meters(extent: Extent, padding_meters: float) -> Extent:
     if padding_meters <= 0:
         return extent.copy()
 
+    if padding_meters <= _FAST_PADDING_MAX_METERS and (
+        max(abs(extent.min_lat), abs(extent.max_lat)) <= _FAST_PADDING_MAX_LAT
+    ):
+        return _apply_padding_local(extent, padding_meters)
+
     # Use pyproj Geod for accurate geodesic calculations
-    geod = pyproj.Geod(ellps="WGS84")
+    geod = _WGS84_GEOD
 
     # Calculate center point
     center_lon = (extent.min_lon + extent.max_lon) / 2
@@ -171,44 +254,51 @@ def extract_metadata_from_kml(kml_path: Path) -> dict[str, str | None]:
         raise FileNotFoundError(f"KML file not found: {kml_path}")
 
     try:
-        tree = ET.parse(kml_path)
-        root = tree.getroot()
-
-        name = None
-        description = None
-
-        # Strategy 1: Try Document-level metadata
-        doc_elem = root.find(".//kml:Document", KML_NS)
-        if doc_elem is not None:
-            name_elem = doc_elem.find("kml:name", KML_NS)
-            desc_elem = doc_elem.find("kml:description", KML_NS)
-
-            if name_elem is not None and name_elem.text:
-                name = name_elem.text.strip()
-                if not name:  # Empty string after strip
-                    name = None
-            if desc_elem is not None and desc_elem.text:
-                description = desc_elem.text.strip()
-                if not description:  # Empty string after strip
-                    description = None
-
-        # Strategy 2: Fallback to first Placemark if Document had no metadata
-        if name is None or description is None:
-            placemark = root.find(".//kml:Placemark", KML_NS)
-            if placemark is not None:
-                if name is None:
-                    name_elem = placemark.find("kml:name", KML_NS)
-                    if name_elem is not None and name_elem.text:
-                        name = name_elem.text.strip()
-                        if not name:  # Empty string after strip
-                            name = None
-
-                if description is None:
-                    desc_elem = placemark.find("kml:description", KML_NS)
-                    if desc_elem is not None and desc_elem.text:
-                        description = desc_elem.text.strip()
-                        if not description:  # Empty string after strip
-                            description = None
+        # Stream the file, recording the direct name/description children of the first
+        # Document and the first Placemark, and stop once nothing more can change
+        document = None
+        placemark = None
+        document_metadata: dict[str, str | None] = {}
+        placemark_metadata: dict[str, str | None] = {}
+        document_done = False
+        placemark_done = False
+        stack: list[ET.Element] = []
+
+        for event, elem in ET.iterparse(kml_path, events=("start", "end")):
+            if event == "start":
+                # Skip the root element, matching a ".//" search from the root
+                if stack and document is None and elem.tag == _DOCUMENT_TAG:
+                    document = elem
+                elif stack and placemark is None and elem.tag == _PLACEMARK_TAG:
+                    placemark = elem
+                stack.append(elem)
+                continue
+
+            stack.pop()
+            parent = stack[-1] if stack else None
+
+            if elem.tag in (_NAME_TAG, _DESCRIPTION_TAG) and parent is not None:
+                # Only the first name/description child counts; empty text means None
+                key = "name" if elem.tag == _NAME_TAG else "description"
+                text = (elem.text.strip() or None) if elem.text else None
+                if parent is document:
+                    document_metadata.setdefault(key, text)
+                elif parent is placemark:
+                    placemark_metadata.setdefault(key, text)
+
+            if elem is document:
+                document_done = True
+            elif elem is placemark:
+                placemark_done = True
+            elem.clear()
+
+            document_complete = document_metadata.get("name") and document_metadata.get("description")
+            if document_done and (placemark_done or document_complete):
+                break
+
+        # Fall back to Placemark metadata for anything the Document didn't have
+        name = document_metadata.get("name") or placemark_metadata.get("name")
+        description = document_metadata.get("description") or placemark_metadata.get("description")
 
         return {
             "name": name,
@@ -228,7 +318,8 @@ def extract_kml_features(kml_path: Path) -> list[ET.Element]:
     - Styles, StyleMaps
     - Any other KML features
 
-    Returns deep copies to prevent mutation.
+    The file is streamed and each feature is detached once complete, so returned
+    elements are independent of each other and of any other call.
 
     Args:
         kml_path: Path to KML file
@@ -244,25 +335,40 @@ def extract_kml_features(kml_path: Path) -> list[ET.Element]:
         raise FileNotFoundError(f"KML file not found: {kml_path}")
 
     try:
-        tree = ET.parse(kml_path)
-        root = tree.getroot()
-
-        # Find Document element
-        doc_elem = root.find(".//kml:Document", KML_NS)
+        # Stream the file, collecting direct children of the first Document
+        doc_elem = None
+        doc_depth = 0
+        features = []
+        stack: list[ET.Element] = []
+
+        for event, elem in ET.iterparse(kml_path, events=("start", "end")):
+            if event == "start":
+                # Skip the root element, matching a ".//" search from the root
+                if stack and doc_elem is None and elem.tag == _DOCUMENT_TAG:
+                    doc_elem = elem
+                    doc_depth = len(stack)
+                stack.append(elem)
+                continue
+
+            stack.pop()
+
+            if elem is doc_elem:
+                break
+
+            if doc_elem is None:
+                # Before the Document: nothing to keep
+                elem.clear()
+            elif len(stack) == doc_depth + 1:
+                # Completed Document child: keep features (skip Document-level
+                # name/description) and detach it so the Document doesn't hold it
+                if elem.tag not in (_NAME_TAG, _DESCRIPTION_TAG):
+                    features.append(elem)
+                doc_elem.remove(elem)
 
         if doc_elem is None:
             logger.warning(f"No Document element found in KML file: {kml_path}")
             return []
 
-        # Extract all features (skip Document-level name/description)
-        features = []
-        skip_tags = [f"{{{KML_NS['kml']}}}name", f"{{{KML_NS['kml']}}}description"]
-
-        for child in doc_elem:
-            if child.tag not in skip_tags:
-                # Deep copy to avoid modifying original
-                features.append(copy.deepcopy(child))
-
         return features
 
     except ET.ParseError as e:
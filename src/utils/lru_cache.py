@@ -0,0 +1,68 @@
+"""Thread-safe least-recently-used cache."""
+
+import threading
+from collections import OrderedDict
+from typing import Generic, TypeVar
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """Bounded mapping that evicts the least recently used entry when full.
+
+    Safe to share between threads; every operation holds an internal lock.
+    """
+
+    def __init__(self, maxsize: int):
+        """Initialize an empty cache.
+
+        Args:
+            maxsize: Maximum number of entries kept
+
+        Raises:
+            ValueError: If maxsize is less than 1
+        """
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be at least 1, got {maxsize}")
+
+        self.maxsize = maxsize
+        self._entries: OrderedDict[K, V] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> V | None:
+        """Look up an entry, marking it as most recently used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None if the key isn't cached
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: K, value: V) -> None:
+        """Store an entry as most recently used, evicting the oldest entry if full.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        """Get the number of cached entries."""
+        return len(self._entries)
@@ -0,0 +1,62 @@
+"""Progress callback helpers for multi-layer generation."""
+
+from collections.abc import Callable
+
+ProgressCallback = Callable[[int, int, str], None]
+
+
+class CombinedLayerProgress:
+    """Combine the progress of layers generated concurrently into one counter.
+
+    Each layer reports its own (current, total); the forwarded progress is the sum of
+    completed tiles over the sum of layer totals, so a single progress bar advances
+    steadily instead of jumping between layers. Layers that haven't reported yet are
+    counted with the largest total seen so far, since the layers of one export cover
+    the same extent and zoom range.
+    """
+
+    def __init__(self, progress_callback: ProgressCallback, total_layers: int):
+        """Initialize the combined counter.
+
+        Args:
+            progress_callback: Callback(current, total, message) to forward to
+            total_layers: Total number of layers being generated
+        """
+        self.progress_callback = progress_callback
+        self.total_layers = total_layers
+        self._layer_progress: dict[int, tuple[int, int]] = {}
+        self._skipped_layers: set[int] = set()
+
+    def skip_layer(self, layer_idx: int) -> None:
+        """Exclude a layer that won't be generated from the combined total.
+
+        Args:
+            layer_idx: Zero-based index of the skipped layer
+        """
+        self._skipped_layers.add(layer_idx)
+
+    def layer_callback(self, layer_idx: int, layer_name: str) -> ProgressCallback:
+        """Create the progress callback for one layer.
+
+        Args:
+            layer_idx: Zero-based index of the layer being generated
+            layer_name: Layer name shown in the message
+
+        Returns:
+            Callback for the layer's generator
+        """
+        prefix = f"Layer {layer_idx + 1}/{self.total_layers} ({layer_name}): "
+
+        def layer_progress(current: int, total: int, message: str) -> None:
+            self._layer_progress[layer_idx] = (current, total)
+            self._forward(prefix + message)
+
+        return layer_progress
+
+    def _forward(self, message: str) -> None:
+        """Send the combined progress to the wrapped callback."""
+        combined_current = sum(current for current, _ in self._layer_progress.values())
+        layer_totals = [total for _, total in self._layer_progress.values()]
+        pending_layers = self.total_layers - len(self._layer_progress) - len(self._skipped_layers)
+        combined_total = sum(layer_totals) + pending_layers * max(layer_totals)
+        self.progress_callback(combined_current, combined_total, message)
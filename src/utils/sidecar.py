@@ -0,0 +1,71 @@
+"""Sidecar files recording the inputs an output file was generated from."""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any
+
+
+def sidecar_path(output_path: Path) -> Path:
+    """Get the sidecar path for an output file.
+
+    Args:
+        output_path: Path to the generated output file
+
+    Returns:
+        Path of the sidecar file next to the output ("<name>.sidecar.json")
+    """
+    return output_path.with_name(f"{output_path.name}.sidecar.json")
+
+
+def compute_output_key(*inputs: Any) -> str:
+    """Hash the inputs that determine an output file's content.
+
+    Args:
+        *inputs: Values with a deterministic repr (generator output format version,
+            extent, zoom range, composition signature, output options, metadata)
+
+    Returns:
+        Hex digest identifying the inputs
+    """
+    return hashlib.blake2b(repr(inputs).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def is_output_current(output_path: Path, key: str) -> bool:
+    """Check whether an output file exists and was generated from the given inputs.
+
+    Args:
+        output_path: Path to the output file
+        key: Key from compute_output_key() for the current inputs
+
+    Returns:
+        True if the output exists and its sidecar records the same key
+    """
+    if not output_path.exists():
+        return False
+
+    try:
+        recorded = json.loads(sidecar_path(output_path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return False
+
+    return isinstance(recorded, dict) and recorded.get("key") == key
+
+
+def write_output_key(output_path: Path, key: str) -> None:
+    """Record the inputs key for a successfully generated output file.
+
+    Args:
+        output_path: Path to the output file
+        key: Key from compute_output_key()
+    """
+    sidecar_path(output_path).write_text(json.dumps({"key": key}), encoding="utf-8")
+
+
+def remove_output_key(output_path: Path) -> None:
+    """Remove an output file's sidecar, if any.
+
+    Args:
+        output_path: Path to the output file
+    """
+    sidecar_path(output_path).unlink(missing_ok=True)
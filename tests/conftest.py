@@ -1,8 +1,10 @@
 """Pytest configuration and fixtures."""
 
 import http.server
-import socketserver
+import shutil
+import tempfile
 import threading
+from pathlib import Path
 
 import pytest
 
@@ -57,13 +59,55 @@ def snapshot(request):
     return SnapshotAssertion(test_name, update_snapshots_flag)
 
 
+@pytest.fixture(scope="session")
+def _tile_http_server(tmp_path_factory):
+    """
+    Start one local tile HTTP server for the whole test session.
+
+    Serves files from a session-scoped root directory; tile_server gives each test
+    its own subdirectory of it.
+
+    Yields:
+        Tuple of (port, root directory)
+    """
+    root_dir = tmp_path_factory.mktemp("tile_server")
+
+    # Create HTTP request handler
+    class TileHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
+        # Keep connections alive between tile requests (file and error responses set Content-Length)
+        protocol_version = "HTTP/1.1"
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, directory=str(root_dir), **kwargs)
+
+        def log_message(self, format, *args):
+            pass  # Suppress logging during tests
+
+    # Start server on auto-assigned port, handling each connection on its own thread
+    # so concurrent tile downloads aren't serialized
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), TileHTTPRequestHandler)
+
+    # Start server thread
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield server.server_address[1], root_dir
+
+    # Cleanup: shutdown server
+    server.shutdown()
+    server.server_close()
+    thread.join(timeout=1.0)
+
+
 @pytest.fixture
-def tile_server(tmp_path):
+def tile_server(_tile_http_server):
     """
-    Fixture for creating a local tile server for testing.
+    Fixture for serving tiles from a local HTTP server during a test.
 
-    Automatically starts an HTTP server serving tiles from a temporary directory
-    and cleans up when the test completes.
+    The server is shared across the session; each test gets a fresh fixtures
+    directory served under its own URL prefix, so tests never see each other's
+    tiles (or each other's cached downloads). The directory is removed when the
+    test completes.
 
     Usage:
         def test_custom_tiles(tile_server):
@@ -73,7 +117,7 @@ def tile_server(tmp_path):
             Image.new("RGBA", (256, 256), (255, 0, 0, 128)).save(tile_path)
 
             # Use in config
-            url_template = f"http://127.0.0.1:{tile_server.port}/{{z}}/{{x}}/{{y}}.png"
+            url_template = tile_server.url_template
             ...
 
     Attributes:
@@ -83,42 +127,21 @@ def tile_server(tmp_path):
     """
 
     class TileServer:
-        def __init__(self, port, fixtures_dir, server, thread):
+        def __init__(self, port, fixtures_dir, prefix):
             self.port = port
             self.fixtures_dir = fixtures_dir
-            self._server = server
-            self._thread = thread
+            self._prefix = prefix
 
         @property
         def url_template(self):
             """Get the standard tile URL template for this server."""
-            return f"http://127.0.0.1:{self.port}/{{z}}/{{x}}/{{y}}.png"
-
-    # Create fixtures directory
-    fixtures_dir = tmp_path / "tile_fixtures"
-    fixtures_dir.mkdir()
-
-    # Create HTTP request handler
-    class TileHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
-        def __init__(self, *args, **kwargs):
-            super().__init__(*args, directory=str(fixtures_dir), **kwargs)
+            return f"http://127.0.0.1:{self.port}/{self._prefix}/{{z}}/{{x}}/{{y}}.png"
 
-        def log_message(self, format, *args):
-            pass  # Suppress logging during tests
-
-    # Start server on auto-assigned port
-    server = socketserver.TCPServer(("127.0.0.1", 0), TileHTTPRequestHandler)
-    port = server.server_address[1]
+    port, root_dir = _tile_http_server
 
-    # Start server thread
-    thread = threading.Thread(target=server.serve_forever, daemon=True)
-    thread.start()
+    # Create this test's fixtures directory
+    fixtures_dir = Path(tempfile.mkdtemp(prefix="tiles_", dir=root_dir))
 
-    # Yield tile server instance to test
-    tile_server_instance = TileServer(port, fixtures_dir, server, thread)
-    yield tile_server_instance
+    yield TileServer(port, fixtures_dir, fixtures_dir.name)
 
-    # Cleanup: shutdown server
-    server.shutdown()
-    server.server_close()
-    thread.join(timeout=1.0)
+    shutil.rmtree(fixtures_dir, ignore_errors=True)
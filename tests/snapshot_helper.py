@@ -1,46 +1,73 @@
 """Snapshot testing utilities for KMZ, MBTiles, and GeoTIFF file comparison."""
 
 import difflib
+import filecmp
 import hashlib
+import io
+import itertools
 import shutil
 import sqlite3
 import zipfile
-from pathlib import Path
+from collections.abc import Iterator
+from pathlib import Path, PurePosixPath
 
+import numpy as np
 import pytest
-from osgeo import gdal
+from osgeo import gdal, gdal_array
 
 # Directory to store snapshot files
 SNAPSHOTS_DIR = Path(__file__).parent / "snapshots"
 
+# Bytes of each MBTiles database memory-mapped while comparing, so tile blobs are
+# read from the page cache instead of copied through SQLite's own buffers
+_MMAP_SIZE = 256 * 1024 * 1024
 
-def hash_file(file_path: Path) -> str:
-    """Calculate SHA256 hash of a file."""
-    sha256 = hashlib.sha256()
-    with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
-            sha256.update(chunk)
-    return sha256.hexdigest()
+# Limits on what a failing snapshot assertion reports, so a badly broken output
+# doesn't produce (or hold in memory) an enormous failure message
+_MAX_REPORTED_DIFFERENCES = 200
+_MAX_DIFF_LINES = 200
 
+# Unchanged lines shown around each text change; fewer lines let the truncated diff
+# cover more of the changes
+_DIFF_CONTEXT_LINES = 1
 
-def is_text_file(file_path: Path) -> bool:
+# Archive entries with these suffixes are compared as text and reported as a diff
+_TEXT_EXTENSIONS = frozenset({".kml", ".xml", ".txt", ".html", ".css", ".js", ".json", ".yaml", ".yml"})
+
+
+def files_identical(file1: Path, file2: Path) -> bool:
+    """Check if two files have identical contents.
+
+    Files of different sizes are rejected without reading them; otherwise the
+    contents are compared up to the first differing byte.
+    """
+    return filecmp.cmp(file1, file2, shallow=False)
+
+
+def is_text_file(file_path: PurePosixPath) -> bool:
     """Check if file is likely a text file."""
-    text_extensions = {".kml", ".xml", ".txt", ".html", ".css", ".js", ".json", ".yaml", ".yml"}
-    return file_path.suffix.lower() in text_extensions
+    return file_path.suffix.lower() in _TEXT_EXTENSIONS
+
+
+def _read_lines(data: bytes) -> list[str]:
+    """Decode UTF-8 text into lines, translating newlines as open() does."""
+    return io.TextIOWrapper(io.BytesIO(data), encoding="utf-8").readlines()
 
 
-def compare_text_files(file1: Path, file2: Path) -> tuple[bool, str]:
+def compare_text_data(data1: bytes, data2: bytes, name: str) -> tuple[bool, str]:
     """
-    Compare two text files and return diff.
+    Compare two text file contents and return diff.
 
     Returns:
         (is_same, diff_text)
     """
+    # Identical bytes need neither decoding nor splitting into lines
+    if data1 == data2:
+        return True, ""
+
     try:
-        with open(file1, encoding="utf-8") as f1:
-            lines1 = f1.readlines()
-        with open(file2, encoding="utf-8") as f2:
-            lines2 = f2.readlines()
+        lines1 = _read_lines(data1)
+        lines2 = _read_lines(data2)
 
         if lines1 == lines2:
             return True, ""
@@ -49,131 +76,127 @@ def compare_text_files(file1: Path, file2: Path) -> tuple[bool, str]:
         diff = difflib.unified_diff(
             lines1,
             lines2,
-            fromfile=f"snapshot/{file1.name}",
-            tofile=f"current/{file2.name}",
+            fromfile=f"snapshot/{name}",
+            tofile=f"current/{name}",
+            n=_DIFF_CONTEXT_LINES,
             lineterm="",
         )
-        diff_text = "\n".join(diff)
+        diff_lines = list(itertools.islice(diff, _MAX_DIFF_LINES + 1))
+        if len(diff_lines) > _MAX_DIFF_LINES:
+            diff_lines[_MAX_DIFF_LINES:] = ["... (diff truncated)"]
+        diff_text = "\n".join(diff_lines)
         return False, diff_text
     except UnicodeDecodeError:
         # Fall back to binary comparison
         return False, "Files differ (binary or encoding issue)"
 
 
-def compare_binary_files(file1: Path, file2: Path) -> tuple[bool, str]:
+def compare_binary_data(data1: bytes, data2: bytes) -> tuple[bool, str]:
     """
-    Compare two binary files.
+    Compare two binary file contents.
 
     Returns:
         (is_same, message)
     """
-    hash1 = hash_file(file1)
-    hash2 = hash_file(file2)
-
-    if hash1 == hash2:
+    if data1 == data2:
         return True, ""
 
-    size1 = file1.stat().st_size
-    size2 = file2.stat().st_size
+    return False, f"Binary files differ (snapshot: {len(data1)} bytes, current: {len(data2)} bytes)"
 
-    return False, f"Binary files differ (snapshot: {size1} bytes, current: {size2} bytes)"
 
+def compare_kmz(kmz1: Path, kmz2: Path) -> Iterator[str]:
+    """Compare the entries of two KMZ archives, yielding differences.
 
-def compare_directories(dir1: Path, dir2: Path, prefix: str = "") -> list[str]:
-    """
-    Recursively compare two directories and return list of differences.
+    Entries are read in memory. Entries whose CRC32 and size in the ZIP central
+    directory match are treated as identical without being decompressed, and
+    entries are only read as the differences are consumed.
 
-    Returns:
-        List of difference messages
+    Args:
+        kmz1: Path to first KMZ (snapshot)
+        kmz2: Path to second KMZ (current)
+
+    Yields:
+        Difference messages
     """
-    differences = []
+    with zipfile.ZipFile(kmz1, "r") as zip1, zipfile.ZipFile(kmz2, "r") as zip2:
+        entries1 = {PurePosixPath(info.filename): info for info in zip1.infolist() if not info.is_dir()}
+        entries2 = {PurePosixPath(info.filename): info for info in zip2.infolist() if not info.is_dir()}
 
-    # Get all files in both directories
-    files1 = {p.relative_to(dir1) for p in dir1.rglob("*") if p.is_file()}
-    files2 = {p.relative_to(dir2) for p in dir2.rglob("*") if p.is_file()}
+        # Check for missing/extra files
+        for rel_path in sorted(entries1.keys() - entries2.keys()):
+            yield f"MISSING in current: {rel_path}"
 
-    # Check for missing/extra files
-    only_in_1 = files1 - files2
-    only_in_2 = files2 - files1
-    common = files1 & files2
+        for rel_path in sorted(entries2.keys() - entries1.keys()):
+            yield f"EXTRA in current: {rel_path}"
 
-    for rel_path in sorted(only_in_1):
-        differences.append(f"{prefix}MISSING in current: {rel_path}")
+        # Compare common files
+        for rel_path in sorted(entries1.keys() & entries2.keys()):
+            info1 = entries1[rel_path]
+            info2 = entries2[rel_path]
+            if info1.CRC == info2.CRC and info1.file_size == info2.file_size:
+                continue
 
-    for rel_path in sorted(only_in_2):
-        differences.append(f"{prefix}EXTRA in current: {rel_path}")
+            data1 = zip1.read(info1)
+            data2 = zip2.read(info2)
 
-    # Compare common files
-    for rel_path in sorted(common):
-        file1 = dir1 / rel_path
-        file2 = dir2 / rel_path
+            if is_text_file(rel_path):
+                is_same, diff = compare_text_data(data1, data2, rel_path.name)
+                if not is_same:
+                    yield f"DIFF {rel_path}:"
+                    yield diff
+            else:
+                is_same, message = compare_binary_data(data1, data2)
+                if not is_same:
+                    yield f"DIFF {rel_path}: {message}"
 
-        if is_text_file(file1):
-            is_same, diff = compare_text_files(file1, file2)
-            if not is_same:
-                differences.append(f"{prefix}DIFF {rel_path}:")
-                differences.append(diff)
-        else:
-            is_same, message = compare_binary_files(file1, file2)
-            if not is_same:
-                differences.append(f"{prefix}DIFF {rel_path}: {message}")
 
-    return differences
+def _read_only_uri(database_path: Path) -> str:
+    """SQLite URI opening a finished database read-only, skipping lock and journal checks."""
+    return f"{database_path.resolve().as_uri()}?mode=ro&immutable=1"
+
 
+def _hash_tile(tile_data: bytes) -> str:
+    """Short hash of a tile blob for difference messages."""
+    return hashlib.blake2b(tile_data, digest_size=8).hexdigest()  # 16 hex chars
 
-def extract_kmz(kmz_path: Path, extract_dir: Path) -> None:
-    """Extract KMZ to directory."""
-    extract_dir.mkdir(parents=True, exist_ok=True)
-    with zipfile.ZipFile(kmz_path, "r") as kmz:
-        kmz.extractall(extract_dir)
 
+def compare_metadata(metadata1: dict, metadata2: dict) -> list[str]:
+    """Compare two metadata dictionaries and return list of differences.
 
-def extract_mbtiles_data(mbtiles_path: Path) -> dict:
-    """Extract MBTiles database contents into comparable format.
+    Both dictionaries are walked once; only the keys that differ are sorted.
 
     Args:
-        mbtiles_path: Path to .mbtiles file
+        metadata1: Snapshot metadata
+        metadata2: Current metadata
 
     Returns:
-        Dictionary with:
-            - metadata: Dict of metadata key-value pairs
-            - tiles: Dict mapping (zoom, x, y) -> tile_hash
-            - tile_count: Total number of tiles
-            - zoom_levels: Set of zoom levels present
+        Difference messages: missing keys, then extra keys, then changed values
     """
-    conn = sqlite3.connect(mbtiles_path)
-    cursor = conn.cursor()
-
-    # Extract metadata
-    cursor.execute("SELECT name, value FROM metadata ORDER BY name")
-    metadata = {row[0]: row[1] for row in cursor.fetchall()}
-
-    # Extract tiles (hash the blob data for comparison)
-    cursor.execute(
-        "SELECT zoom_level, tile_column, tile_row, tile_data FROM tiles ORDER BY zoom_level, tile_column, tile_row"
-    )
-    tiles = {}
-    zoom_levels = set()
+    missing = []
+    changed = []
+    for key, value1 in metadata1.items():
+        if key not in metadata2:
+            missing.append(key)
+        elif value1 != metadata2[key]:
+            changed.append(key)
+    extra = [key for key in metadata2 if key not in metadata1]
+
+    differences = [f"MISSING metadata in current: {key} = {metadata1[key]}" for key in sorted(missing)]
+    differences.extend(f"EXTRA metadata in current: {key} = {metadata2[key]}" for key in sorted(extra))
+    for key in sorted(changed):
+        differences.append(f"DIFF metadata '{key}':")
+        differences.append(f"  Snapshot: {metadata1[key]}")
+        differences.append(f"  Current:  {metadata2[key]}")
 
-    for row in cursor.fetchall():
-        zoom, x, y, tile_data = row
-        tile_hash = hashlib.sha256(tile_data).hexdigest()[:16]  # First 16 chars of hash
-        tiles[(zoom, x, y)] = tile_hash
-        zoom_levels.add(zoom)
-
-    conn.close()
-
-    return {
-        "metadata": metadata,
-        "tiles": tiles,
-        "tile_count": len(tiles),
-        "zoom_levels": sorted(zoom_levels),
-    }
+    return differences
 
 
 def compare_mbtiles(mbtiles1: Path, mbtiles2: Path) -> list[str]:
     """Compare two MBTiles databases and return list of differences.
 
+    The snapshot is attached to the current database so tile sets and contents
+    are compared inside SQLite; only differing tiles are returned to Python.
+
     Args:
         mbtiles1: Path to first MBTiles (snapshot)
         mbtiles2: Path to second MBTiles (current)
@@ -183,67 +206,71 @@ def compare_mbtiles(mbtiles1: Path, mbtiles2: Path) -> list[str]:
     """
     differences = []
 
-    # Extract data from both databases
-    data1 = extract_mbtiles_data(mbtiles1)
-    data2 = extract_mbtiles_data(mbtiles2)
-
-    # Compare metadata
-    metadata1 = data1["metadata"]
-    metadata2 = data2["metadata"]
-
-    # Check for missing/extra metadata keys
-    keys1 = set(metadata1.keys())
-    keys2 = set(metadata2.keys())
-
-    for key in sorted(keys1 - keys2):
-        differences.append(f"MISSING metadata in current: {key} = {metadata1[key]}")
-
-    for key in sorted(keys2 - keys1):
-        differences.append(f"EXTRA metadata in current: {key} = {metadata2[key]}")
-
-    # Compare common metadata values
-    for key in sorted(keys1 & keys2):
-        if metadata1[key] != metadata2[key]:
-            differences.append(f"DIFF metadata '{key}':")
-            differences.append(f"  Snapshot: {metadata1[key]}")
-            differences.append(f"  Current:  {metadata2[key]}")
-
-    # Compare tile counts and zoom levels
-    if data1["tile_count"] != data2["tile_count"]:
-        differences.append(f"DIFF tile count: snapshot={data1['tile_count']}, current={data2['tile_count']}")
-
-    if data1["zoom_levels"] != data2["zoom_levels"]:
-        differences.append(f"DIFF zoom levels: snapshot={data1['zoom_levels']}, current={data2['zoom_levels']}")
-
-    # Compare individual tiles
-    tiles1 = data1["tiles"]
-    tiles2 = data2["tiles"]
-
-    coords1 = set(tiles1.keys())
-    coords2 = set(tiles2.keys())
-
-    missing_tiles = coords1 - coords2
-    extra_tiles = coords2 - coords1
-
-    if missing_tiles:
-        sample = sorted(missing_tiles)[:5]
-        differences.append(f"MISSING {len(missing_tiles)} tiles in current (sample): {sample}")
-
-    if extra_tiles:
-        sample = sorted(extra_tiles)[:5]
-        differences.append(f"EXTRA {len(extra_tiles)} tiles in current (sample): {sample}")
-
-    # Compare common tiles (by hash)
-    differing_tiles = []
-    for coord in sorted(coords1 & coords2):
-        if tiles1[coord] != tiles2[coord]:
-            differing_tiles.append(coord)
+    conn = sqlite3.connect(_read_only_uri(mbtiles2), uri=True)
+    try:
+        conn.execute("ATTACH DATABASE ? AS snap", (_read_only_uri(mbtiles1),))
+        conn.execute(f"PRAGMA mmap_size = {_MMAP_SIZE}")
+        conn.execute(f"PRAGMA snap.mmap_size = {_MMAP_SIZE}")
+
+        # Compare metadata
+        metadata1 = dict(conn.execute("SELECT name, value FROM snap.metadata"))
+        metadata2 = dict(conn.execute("SELECT name, value FROM main.metadata"))
+        differences.extend(compare_metadata(metadata1, metadata2))
+
+        # Compare tile counts and zoom levels
+        (count1,) = conn.execute("SELECT COUNT(*) FROM snap.tiles").fetchone()
+        (count2,) = conn.execute("SELECT COUNT(*) FROM main.tiles").fetchone()
+        if count1 != count2:
+            differences.append(f"DIFF tile count: snapshot={count1}, current={count2}")
+
+        zoom_query = "SELECT DISTINCT zoom_level FROM {}.tiles ORDER BY zoom_level"
+        zoom_levels1 = [zoom for (zoom,) in conn.execute(zoom_query.format("snap"))]
+        zoom_levels2 = [zoom for (zoom,) in conn.execute(zoom_query.format("main"))]
+        if zoom_levels1 != zoom_levels2:
+            differences.append(f"DIFF zoom levels: snapshot={zoom_levels1}, current={zoom_levels2}")
+
+        # Compare tile coordinates
+        except_query = """
+            SELECT zoom_level, tile_column, tile_row FROM {}.tiles
+            EXCEPT
+            SELECT zoom_level, tile_column, tile_row FROM {}.tiles
+            ORDER BY 1, 2, 3
+        """
+        missing_tiles = conn.execute(except_query.format("snap", "main")).fetchall()
+        extra_tiles = conn.execute(except_query.format("main", "snap")).fetchall()
+
+        if missing_tiles:
+            sample = missing_tiles[:5]
+            differences.append(f"MISSING {len(missing_tiles)} tiles in current (sample): {sample}")
+
+        if extra_tiles:
+            sample = extra_tiles[:5]
+            differences.append(f"EXTRA {len(extra_tiles)} tiles in current (sample): {sample}")
+
+        # Compare common tiles (by content). Blobs are compared inside SQLite and only
+        # the coordinates come back; just the sampled tiles' blobs are read for hashing
+        differing_tiles = conn.execute("""
+            SELECT s.zoom_level, s.tile_column, s.tile_row
+            FROM snap.tiles AS s
+            JOIN main.tiles AS c USING (zoom_level, tile_column, tile_row)
+            WHERE s.tile_data IS NOT c.tile_data
+            ORDER BY 1, 2, 3
+        """).fetchall()
+
+        tile_query = "SELECT tile_data FROM {}.tiles WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?"
+        sample_hashes = []
+        for coord in differing_tiles[:5]:
+            (tile_data1,) = conn.execute(tile_query.format("snap"), coord).fetchone()
+            (tile_data2,) = conn.execute(tile_query.format("main"), coord).fetchone()
+            sample_hashes.append((_hash_tile(tile_data1), _hash_tile(tile_data2)))
+    finally:
+        conn.close()
 
     if differing_tiles:
         sample = differing_tiles[:5]
         differences.append(f"DIFF {len(differing_tiles)} tiles have different content (sample): {sample}")
-        for coord in sample:
-            differences.append(f"  Tile {coord}: snapshot_hash={tiles1[coord]}, current_hash={tiles2[coord]}")
+        for coord, (hash1, hash2) in zip(sample, sample_hashes, strict=True):
+            differences.append(f"  Tile {coord}: snapshot_hash={hash1}, current_hash={hash2}")
 
     return differences
 
@@ -293,11 +320,15 @@ def extract_geotiff_data(geotiff_path: Path) -> dict:
     sample_rows = min(10, height)
     row_indices = [int(i * height / sample_rows) for i in range(sample_rows)]
 
-    raster_hash = hashlib.sha256()
-    for row_idx in row_indices:
-        row_data = band.ReadAsArray(0, row_idx, width, 1)
-        if row_data is not None:
-            raster_hash.update(row_data.tobytes())
+    # Read the sampled rows into one preallocated buffer instead of allocating an array
+    # per row. Exact rows are kept: a downsampled read could be served from overviews
+    dtype = gdal_array.GDALTypeCodeToNumericTypeCode(band.DataType)
+    samples = np.zeros((sample_rows, width), dtype=dtype)
+    for i, row_idx in enumerate(row_indices):
+        band.ReadAsArray(0, row_idx, width, 1, buf_obj=samples[i : i + 1])
+
+    raster_hash = hashlib.blake2b(digest_size=8)
+    raster_hash.update(samples.tobytes())
 
     # Extract metadata
     metadata = {}
@@ -314,7 +345,7 @@ def extract_geotiff_data(geotiff_path: Path) -> dict:
         "geotransform": geotransform,
         "compression": compression,
         "overview_count": overview_count,
-        "raster_hash": raster_hash.hexdigest()[:16],  # First 16 chars
+        "raster_hash": raster_hash.hexdigest(),  # 16 hex chars
         "metadata": metadata,
     }
 
@@ -372,25 +403,18 @@ def compare_geotiff(geotiff1: Path, geotiff2: Path) -> list[str]:
         )
 
     # Compare metadata
-    metadata1 = data1["metadata"]
-    metadata2 = data2["metadata"]
-
-    keys1 = set(metadata1.keys())
-    keys2 = set(metadata2.keys())
-
-    for key in sorted(keys1 - keys2):
-        differences.append(f"MISSING metadata in current: {key} = {metadata1[key]}")
+    differences.extend(compare_metadata(data1["metadata"], data2["metadata"]))
 
-    for key in sorted(keys2 - keys1):
-        differences.append(f"EXTRA metadata in current: {key} = {metadata2[key]}")
+    return differences
 
-    for key in sorted(keys1 & keys2):
-        if metadata1[key] != metadata2[key]:
-            differences.append(f"DIFF metadata '{key}':")
-            differences.append(f"  Snapshot: {metadata1[key]}")
-            differences.append(f"  Current:  {metadata2[key]}")
 
-    return differences
+# Format-specific comparison for each supported snapshot extension
+_COMPARATORS = {
+    ".kmz": compare_kmz,
+    ".mbtiles": compare_mbtiles,
+    ".tif": compare_geotiff,
+    ".tiff": compare_geotiff,
+}
 
 
 class SnapshotAssertion:
@@ -417,16 +441,16 @@ class SnapshotAssertion:
 
         # Detect file type and set snapshot path
         file_ext = file_path.suffix.lower()
-        if file_ext not in [".kmz", ".mbtiles", ".tif", ".tiff"]:
+        comparator = _COMPARATORS.get(file_ext)
+        if comparator is None:
             raise AssertionError(f"Unsupported file type: {file_ext} (must be .kmz, .mbtiles, or .tif/.tiff)")
 
         self.snapshot_path = SNAPSHOTS_DIR / f"{self.test_name}{file_ext}"
 
-        # Create snapshots directory if it doesn't exist
-        SNAPSHOTS_DIR.mkdir(parents=True, exist_ok=True)
-
         # If update mode or no snapshot exists, save as snapshot
         if self.update_snapshots or not self.snapshot_path.exists():
+            # Create snapshots directory if it doesn't exist
+            SNAPSHOTS_DIR.mkdir(parents=True, exist_ok=True)
             shutil.copy(file_path, self.snapshot_path)
             if self.update_snapshots:
                 pytest.skip(f"Snapshot updated: {self.test_name}")
@@ -434,21 +458,17 @@ class SnapshotAssertion:
             # This allows new tests to pass on first run
             return
 
-        # Quick hash comparison
-        current_hash = hash_file(file_path)
-        snapshot_hash = hash_file(self.snapshot_path)
-
-        if current_hash == snapshot_hash:
+        # Quick byte comparison
+        if files_identical(file_path, self.snapshot_path):
             # Perfect match!
             return
 
-        # Hashes differ - perform format-specific comparison
-        if file_ext == ".kmz":
-            self._compare_kmz(file_path)
-        elif file_ext == ".mbtiles":
-            self._compare_mbtiles(file_path)
-        elif file_ext in [".tif", ".tiff"]:
-            self._compare_geotiff(file_path)
+        # Files differ - perform format-specific comparison, keeping only as many
+        # differences as are reported
+        differences = comparator(self.snapshot_path, file_path)
+        self.differences = list(itertools.islice(differences, _MAX_REPORTED_DIFFERENCES + 1))
+        if len(self.differences) > _MAX_REPORTED_DIFFERENCES:
+            self.differences[_MAX_REPORTED_DIFFERENCES:] = ["... (further differences truncated)"]
 
         if self.differences:
             error_msg = f"\n{'=' * 70}\nSnapshot mismatch for {self.test_name}\n{'=' * 70}\n"
@@ -457,29 +477,3 @@ class SnapshotAssertion:
             error_msg += "To update snapshot, run: pytest --update-snapshots\n"
             error_msg += f"Or delete: {self.snapshot_path}\n"
             raise AssertionError(error_msg)
-
-    def _compare_kmz(self, kmz_path: Path) -> None:
-        """Compare KMZ files by extracting and comparing contents."""
-        import tempfile
-
-        assert self.snapshot_path is not None, "snapshot_path must be set before comparing"
-
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-            current_dir = temp_path / "current"
-            snapshot_dir = temp_path / "snapshot"
-
-            extract_kmz(kmz_path, current_dir)
-            extract_kmz(self.snapshot_path, snapshot_dir)
-
-            self.differences = compare_directories(snapshot_dir, current_dir)
-
-    def _compare_mbtiles(self, mbtiles_path: Path) -> None:
-        """Compare MBTiles files by comparing database contents."""
-        assert self.snapshot_path is not None, "snapshot_path must be set before comparing"
-        self.differences = compare_mbtiles(self.snapshot_path, mbtiles_path)
-
-    def _compare_geotiff(self, geotiff_path: Path) -> None:
-        """Compare GeoTIFF files by comparing metadata and raster data."""
-        assert self.snapshot_path is not None, "snapshot_path must be set before comparing"
-        self.differences = compare_geotiff(self.snapshot_path, geotiff_path)
@@ -1,8 +1,16 @@
 """Tests for core functionality."""
 
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
 from src.core.config import LAYERS
 from src.core.tile_calculator import CHUNK_SIZE, WEB_COMPATIBLE_MAX_TOTAL_CHUNKS, TileCalculator
+from src.gui.tile_compositor import TileCompositor
 from src.models.extent import Extent
+from src.utils.image_encoding import ImageEncoder
 
 
 def test_layer_config():
@@ -81,6 +89,16 @@ def test_extent_japan_region():
     assert not new_york_extent.is_within_japan_region()
 
 
+def test_tile_range_bounds_extent_tiles():
+    """Test the tile range is the bounding box of the tiles in the extent."""
+    tiles = TileCalculator.get_tiles_in_extent(139.69, 35.67, 139.71, 35.69, 12)
+    x_min, y_min, x_max, y_max = TileCalculator.get_tile_range(139.69, 35.67, 139.71, 35.69, 12)
+
+    assert (x_min, x_max) == (min(x for x, _ in tiles), max(x for x, _ in tiles))
+    assert (y_min, y_max) == (min(y for _, y in tiles), max(y for _, y in tiles))
+    assert len(tiles) == (x_max - x_min + 1) * (y_max - y_min + 1)
+
+
 def test_tile_count_estimation():
     """Test tile count estimation."""
     # Small extent at zoom 12
@@ -90,6 +108,24 @@ def test_tile_count_estimation():
     assert isinstance(count, int)
 
 
+@pytest.mark.parametrize(
+    ("min_lon", "min_lat", "max_lon", "max_lat"),
+    [
+        (139.69, 35.67, 139.71, 35.69),  # Small extent in Tokyo
+        (122.0, 20.0, 154.0, 46.0),  # All of Japan
+        (-180.0, -85.0, 180.0, 85.0),  # Whole world
+        (-10.0, 80.0, 10.0, 89.0),  # Past the Web Mercator limit (negative tile rows)
+    ],
+)
+def test_tile_count_range_matches_per_zoom(min_lon, min_lat, max_lon, max_lat):
+    """Test the range estimate agrees with per-zoom estimates."""
+    counts = TileCalculator.estimate_tile_counts_range(min_lon, min_lat, max_lon, max_lat, 2, 18)
+
+    assert counts.tolist() == [
+        TileCalculator.estimate_tile_count(min_lon, min_lat, max_lon, max_lat, zoom) for zoom in range(2, 19)
+    ]
+
+
 def test_download_size_estimation():
     """Test download size estimation."""
     # 100 PNG tiles
@@ -239,3 +275,90 @@ def test_multi_layer_chunk_limit_enforcement():
         assert total_chunks <= WEB_COMPATIBLE_MAX_TOTAL_CHUNKS, (
             f"{layer_count} layers with {chunks} chunks each = {total_chunks} total exceeds limit"
         )
+
+
+def test_single_layer_blend_matches_full_composite():
+    """Test the single opaque layer fast path produces the same PNG as blending."""
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 256, (256, 256, 4), dtype=np.uint8)
+    transparent = Image.new("RGBA", (256, 256), (0, 0, 0, 0))
+
+    pixels[:, :, 3] = 255
+    opaque = Image.fromarray(pixels, mode="RGBA")
+    pixels[:128, :, 3] = 100
+    partial = Image.fromarray(pixels, mode="RGBA")
+
+    for tile in (opaque, partial):
+        single = TileCompositor._blend_tile_stack([(tile, 100, "normal")])
+        stacked = TileCompositor._blend_tile_stack([(transparent, 100, "normal"), (tile, 100, "normal")])
+        assert single == stacked
+
+
+def test_blend_skips_layers_hidden_by_opaque_layer(monkeypatch):
+    """Test dropping layers under an opaque normal layer matches blending every layer."""
+    rng = np.random.default_rng(1)
+    bottom, middle, top = (rng.integers(0, 256, (256, 256, 4), dtype=np.uint8) for _ in range(3))
+    middle[:, :, 3] = 255
+    stack = [
+        (Image.fromarray(bottom, mode="RGBA"), 100, "multiply"),
+        (Image.fromarray(middle, mode="RGBA"), 100, "normal"),
+        (Image.fromarray(top, mode="RGBA"), 60, "screen"),
+    ]
+
+    compacted = TileCompositor._blend_tile_stack(stack)
+    monkeypatch.setattr(TileCompositor, "_covers_canvas", staticmethod(lambda tile, opacity, blend_mode: False))
+    full = TileCompositor._blend_tile_stack(stack)
+
+    assert compacted == full
+
+
+def test_tile_count_estimation_is_memoized():
+    """Test repeated estimates for the same extent and zoom reuse the cached result."""
+    TileCalculator.estimate_tile_count.cache_clear()
+
+    first = TileCalculator.estimate_tile_count(138.5, 35.0, 139.0, 35.5, 12)
+    second = TileCalculator.estimate_tile_count(138.5, 35.0, 139.0, 35.5, 12)
+
+    assert first == second == len(TileCalculator.get_tiles_in_extent(138.5, 35.0, 139.0, 35.5, 12))
+    assert TileCalculator.estimate_tile_count.cache_info().hits == 1
+
+
+def test_fetch_tile_reuses_decoded_tiles_in_memory(monkeypatch):
+    """Test a decoded source tile is served from memory without touching disk or network."""
+    compositor = TileCompositor()
+    url = "http://127.0.0.1:1/memory-cache-test/12/3641/1613.png"
+    tile = Image.new("RGBA", (256, 256), (255, 0, 0, 255))
+    compositor._memory_cache_tile(url, tile)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("tile should come from the in-memory cache")
+
+    monkeypatch.setattr(compositor, "_get_cache_path", fail)
+
+    assert compositor.fetch_tile_sync(url) is tile
+    upsampled = compositor.fetch_tile_sync(url, needs_upsampling=True, scale_factor=2)
+    assert upsampled is not None
+    assert upsampled.size == (256, 256)
+    assert TileCompositor(enable_cache=False)._get_memory_cached_tile(url) is None
+
+
+@pytest.mark.parametrize("image_format", ["png", "jpg"])
+def test_encode_image_matches_png_round_trip(image_format):
+    """Test encoding a composited image directly matches re-encoding its PNG bytes."""
+    tile = Image.new("RGBA", (256, 256), (40, 120, 200, 128))
+
+    direct = ImageEncoder.encode_image(tile, image_format, 85)
+    round_trip = ImageEncoder.encode_tile(TileCompositor._encode_png(tile), image_format, 85)
+
+    assert direct == round_trip
+
+
+def test_encode_tile_passes_jpeg_through():
+    """Test JPEG input is returned as-is for jpg output and converted for png output."""
+    jpeg = ImageEncoder.encode_image(Image.new("RGB", (256, 256), (40, 120, 200)), "jpg", 85)
+
+    assert ImageEncoder.encode_tile(jpeg, "jpg", 50) is jpeg
+    assert Image.open(io.BytesIO(ImageEncoder.encode_tile(jpeg, "png"))).format == "PNG"
+
+    with pytest.raises(ValueError):
+        ImageEncoder.encode_tile(jpeg, "jpg", 0)
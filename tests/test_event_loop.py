@@ -0,0 +1,96 @@
+"""Tests for the per-thread event loop helpers."""
+
+import asyncio
+
+import pytest
+
+from src.utils.event_loop import close_event_loop, gather_or_cancel, get_event_loop, run_async
+
+
+def test_run_async_reuses_loop():
+    """Test consecutive calls on one thread run on the same loop."""
+
+    async def current_loop() -> asyncio.AbstractEventLoop:
+        return asyncio.get_running_loop()
+
+    try:
+        assert run_async(current_loop()) is run_async(current_loop())
+    finally:
+        close_event_loop()
+
+
+def test_run_async_cleans_up_pending_tasks_on_error():
+    """Test a failed gather cancels its sibling tasks and runs their cleanup."""
+    cleaned_up = []
+
+    async def slow_layer(idx: int) -> None:
+        try:
+            await asyncio.sleep(60)
+        finally:
+            cleaned_up.append(idx)
+
+    async def failing_layer() -> None:
+        await asyncio.sleep(0)
+        raise ValueError("layer failed")
+
+    async def run_layers() -> None:
+        await asyncio.gather(slow_layer(0), failing_layer(), slow_layer(2))
+
+    try:
+        with pytest.raises(ValueError):
+            run_async(run_layers())
+
+        assert sorted(cleaned_up) == [0, 2]
+        assert not asyncio.all_tasks(get_event_loop())
+    finally:
+        close_event_loop()
+
+
+def test_gather_or_cancel_cancels_siblings_before_raising():
+    """Test the other coroutines are finished before the first error propagates."""
+    cleaned_up = []
+
+    async def slow_layer(idx: int) -> None:
+        try:
+            await asyncio.sleep(60)
+        finally:
+            cleaned_up.append(idx)
+
+    async def failing_layer() -> None:
+        await asyncio.sleep(0)
+        raise ValueError("layer failed")
+
+    async def run_layers() -> list[int]:
+        try:
+            await gather_or_cancel(slow_layer(0), failing_layer(), slow_layer(2))
+        except ValueError:
+            return sorted(cleaned_up)
+        return []
+
+    try:
+        assert run_async(run_layers()) == [0, 2]
+    finally:
+        close_event_loop()
+
+
+def test_run_async_cancels_stray_tasks_on_success():
+    """Test tasks left running by a successful coroutine don't outlive the call."""
+    cleaned_up = []
+
+    async def background() -> None:
+        try:
+            await asyncio.sleep(60)
+        finally:
+            cleaned_up.append(True)
+
+    async def start_background() -> str:
+        asyncio.get_running_loop().create_task(background())
+        await asyncio.sleep(0)
+        return "done"
+
+    try:
+        assert run_async(start_background()) == "done"
+        assert cleaned_up == [True]
+        assert not asyncio.all_tasks(get_event_loop())
+    finally:
+        close_event_loop()
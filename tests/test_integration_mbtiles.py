@@ -1,11 +1,15 @@
 """Integration tests for MBTiles generation with snapshot testing."""
 
+import socket
 import tempfile
 from pathlib import Path
+from typing import Any
 
 import yaml
+from PIL import Image
 
 from src.cli import run_cli
+from src.utils.sidecar import sidecar_path
 
 
 def test_mbtiles_basic_single_layer_png(snapshot):
@@ -139,6 +143,127 @@ def test_mbtiles_separate_export_mode(snapshot):
         # Note: Second file snapshot would need a different test or modified snapshot helper
 
 
+def test_mbtiles_separate_skips_up_to_date_layers(tile_server):
+    """Test re-running a separate export leaves unchanged layer files untouched."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+
+        for x, y in [(3637, 1612), (3637, 1613)]:
+            tile_path = tile_server.fixtures_dir / "12" / str(x) / f"{y}.png"
+            tile_path.parent.mkdir(parents=True, exist_ok=True)
+            Image.new("RGBA", (256, 256), (255, 0, 0, 128)).save(tile_path)
+
+        # Serve both layers locally, so a network failure can't keep the files from being current
+        source = {
+            "url_template": tile_server.url_template,
+            "extension": "png",
+            "min_zoom": 10,
+            "max_zoom": 14,
+            "attribution": "Test",
+            "category": "other",
+        }
+        config: dict[str, Any] = {
+            "layer_sources": {
+                "base": {**source, "display_name": "Base"},
+                "overlay": {**source, "display_name": "Overlay"},
+            },
+            "extent": {
+                "type": "latlon",
+                "min_lon": 139.69,
+                "min_lat": 35.67,
+                "max_lon": 139.71,
+                "max_lat": 35.69,
+            },
+            "min_zoom": 12,
+            "max_zoom": 12,
+            "layers": ["base", {"name": "overlay", "opacity": 70}],
+            "outputs": [
+                {
+                    "type": "mbtiles",
+                    "path": str(temp_path / "output.mbtiles"),
+                    "export_mode": "separate",
+                }
+            ],
+            "include_timestamp": False,
+            "enable_cache": False,
+        }
+
+        config_path = temp_path / "config.yaml"
+        with open(config_path, "w") as f:
+            yaml.dump(config, f)
+
+        assert run_cli(str(config_path)) == 0
+        base_file = temp_path / "output_base.mbtiles"
+        overlay_file = temp_path / "output_overlay.mbtiles"
+        base_mtime = base_file.stat().st_mtime_ns
+        overlay_mtime = overlay_file.stat().st_mtime_ns
+
+        # Change only the overlay layer's opacity and export again
+        config["layers"] = ["base", {"name": "overlay", "opacity": 50}]
+        with open(config_path, "w") as f:
+            yaml.dump(config, f)
+
+        assert run_cli(str(config_path)) == 0
+        assert base_file.stat().st_mtime_ns == base_mtime
+        assert overlay_file.stat().st_mtime_ns != overlay_mtime
+
+
+def test_mbtiles_separate_failed_fetch_not_marked_current(tile_server):
+    """Test a layer file with failed tile fetches gets no sidecar, so it is regenerated."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+
+        for x, y in [(3637, 1612), (3637, 1613)]:
+            tile_path = tile_server.fixtures_dir / "12" / str(x) / f"{y}.png"
+            tile_path.parent.mkdir(parents=True, exist_ok=True)
+            Image.new("RGBA", (256, 256), (255, 0, 0, 128)).save(tile_path)
+
+        # Nothing listens on a port that was just released, so every fetch is refused
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            closed_port = sock.getsockname()[1]
+
+        source = {"extension": "png", "min_zoom": 10, "max_zoom": 14, "attribution": "Test", "category": "other"}
+        config = {
+            "layer_sources": {
+                "served": {**source, "url_template": tile_server.url_template, "display_name": "Served"},
+                "unreachable": {
+                    **source,
+                    "url_template": f"http://127.0.0.1:{closed_port}/{{z}}/{{x}}/{{y}}.png",
+                    "display_name": "Unreachable",
+                },
+            },
+            "extent": {
+                "type": "latlon",
+                "min_lon": 139.69,
+                "min_lat": 35.67,
+                "max_lon": 139.71,
+                "max_lat": 35.69,
+            },
+            "min_zoom": 12,
+            "max_zoom": 12,
+            "layers": ["served", "unreachable"],
+            "outputs": [
+                {
+                    "type": "mbtiles",
+                    "path": str(temp_path / "output.mbtiles"),
+                    "export_mode": "separate",
+                }
+            ],
+            "include_timestamp": False,
+            "enable_cache": False,
+        }
+
+        config_path = temp_path / "config.yaml"
+        with open(config_path, "w") as f:
+            yaml.dump(config, f)
+
+        assert run_cli(str(config_path)) == 0
+        unreachable_file = temp_path / "output_unreachable.mbtiles"
+        assert unreachable_file.exists()
+        assert not sidecar_path(unreachable_file).exists()
+
+
 def test_mbtiles_multi_zoom(snapshot):
     """Test MBTiles with multiple zoom levels."""
     with tempfile.TemporaryDirectory() as temp_dir:
@@ -4,7 +4,15 @@ from pathlib import Path
 
 import pytest
 
-from src.utils.kml_extent import extract_kml_features, extract_metadata_from_kml
+from src.models.extent import Extent
+from src.utils import kml_extent
+from src.utils.kml_extent import (
+    apply_padding_meters,
+    calculate_extent_from_kml,
+    extract_coordinates_from_kml,
+    extract_kml_features,
+    extract_metadata_from_kml,
+)
 
 
 def test_extract_metadata_from_document_level():
@@ -56,6 +64,7 @@ def test_extract_kml_features_with_styles_and_folders():
 
     # Verify features are ElementTree Elements
     import xml.etree.ElementTree as ET
+
     assert all(isinstance(f, ET.Element) for f in features)
 
     # Get tags (namespace-qualified)
@@ -105,3 +114,39 @@ def test_extract_kml_features_deep_copy():
     assert len(features1) == len(features2)
     assert features1 is not features2
     assert features1[0] is not features2[0]
+
+
+def test_calculate_extent_from_kml():
+    """Test the extent is the bounding box of the KML's coordinates."""
+    kml_path = Path(__file__).parent / "fixtures" / "test_extent_with_metadata.kml"
+
+    extent = calculate_extent_from_kml(kml_path)
+
+    assert (extent.min_lon, extent.min_lat, extent.max_lon, extent.max_lat) == (139.69, 35.67, 139.71, 35.69)
+
+
+def test_extract_coordinates_mixed_tuple_lengths(tmp_path):
+    """Test 2D and 3D coordinate tuples can be mixed, and tuples without a latitude are skipped."""
+    kml_path = tmp_path / "mixed.kml"
+    kml_path.write_text(
+        '<kml xmlns="http://www.opengis.net/kml/2.2"><Placemark><LineString>'
+        "<coordinates>1,2 3,4,100 5 6,7</coordinates>"
+        "</LineString></Placemark></kml>"
+    )
+
+    coords = extract_coordinates_from_kml(kml_path)
+
+    assert coords.tolist() == [[1, 2], [3, 4], [6, 7]]
+
+
+@pytest.mark.parametrize("padding_meters", [50.0, 1000.0, 10_000.0])
+def test_apply_padding_local_matches_geodesic(monkeypatch, padding_meters):
+    """Test small paddings agree with the geodesic solution to well under a meter."""
+    extent = Extent(min_lon=139.6, min_lat=35.6, max_lon=139.8, max_lat=35.8)
+
+    fast = apply_padding_meters(extent, padding_meters)
+    monkeypatch.setattr(kml_extent, "_FAST_PADDING_MAX_METERS", 0.0)
+    geodesic = apply_padding_meters(extent, padding_meters)
+
+    for side in ("min_lon", "min_lat", "max_lon", "max_lat"):
+        assert getattr(fast, side) == pytest.approx(getattr(geodesic, side), abs=1e-5)
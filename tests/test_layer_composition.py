@@ -0,0 +1,160 @@
+"""Tests for LayerComposition zoom selection and serialization."""
+
+import numpy as np
+import pytest
+
+from src.core.config import LAYERS
+from src.models.layer_composition import LayerComposition, iter_zooms, zooms_to_mask
+
+
+def make_composition(
+    *,
+    opacity: int = 100,
+    blend_mode: str = "normal",
+    export_mode: str = "composite",
+    lod_mode: str = "all_zooms",
+    selected_zooms_mask: int = 0,
+    enabled: bool = True,
+    max_resample_distance: int | None = None,
+) -> LayerComposition:
+    """Create a composition on the standard map layer (zoom 2-18)."""
+    return LayerComposition(
+        layer_config=LAYERS["std"],
+        opacity=opacity,
+        blend_mode=blend_mode,
+        export_mode=export_mode,
+        lod_mode=lod_mode,
+        selected_zooms_mask=selected_zooms_mask,
+        enabled=enabled,
+        max_resample_distance=max_resample_distance,
+    )
+
+
+def test_find_best_source_zoom_rules():
+    """Test nearest-zoom selection, preferring the higher zoom when equidistant."""
+    comp = make_composition()
+    available = zooms_to_mask({11, 13, 15})
+
+    assert comp.find_best_source_zoom(13, available) == 13  # Native
+    assert comp.find_best_source_zoom(12, available) == 13  # Equidistant, prefer higher
+    assert comp.find_best_source_zoom(10, available) == 11  # Only higher zooms
+    assert comp.find_best_source_zoom(18, available) == 15  # Only lower zooms
+
+
+def test_find_best_source_zooms_matches_scalar():
+    """Test the vectorized lookup agrees with find_best_source_zoom for every target."""
+    comp = make_composition()
+    targets = np.arange(0, 19)
+
+    for available in [{11}, {11, 15}, {12, 14}, {2, 9, 10, 18}, set(range(2, 19))]:
+        mask = zooms_to_mask(available)
+        expected = [comp.find_best_source_zoom(int(z), mask) for z in targets]
+        assert comp.find_best_source_zooms(targets, mask).tolist() == expected
+
+
+def test_find_best_source_zooms_without_available_zooms():
+    """Test the vectorized lookup falls back to the layer's max zoom."""
+    comp = make_composition()
+
+    result = comp.find_best_source_zooms(np.array([12, 18]), 0)
+
+    assert result.tolist() == [12, 18]
+
+
+@pytest.mark.parametrize(
+    "kwargs", [{"opacity": 101}, {"opacity": -1}, {"blend_mode": "darken"}, {"lod_mode": "some_zooms"}]
+)
+def test_invalid_settings_rejected(kwargs):
+    """Test construction rejects out-of-range opacity and unknown modes."""
+    with pytest.raises(ValueError):
+        make_composition(**kwargs)
+
+
+def test_iter_effective_zooms_unlimited_by_default():
+    """Test every target zoom is yielded when no resample limit is set."""
+    comp = make_composition(lod_mode="select_zooms", selected_zooms_mask=zooms_to_mask({10}))
+
+    assert list(comp.iter_effective_zooms(4, 16)) == list(range(4, 17))
+
+
+def test_iter_effective_zooms_skips_distant_zooms():
+    """Test zooms beyond max_resample_distance from every available zoom are skipped."""
+    comp = make_composition(
+        lod_mode="select_zooms", selected_zooms_mask=zooms_to_mask({10, 16}), max_resample_distance=2
+    )
+
+    assert list(comp.iter_effective_zooms(4, 18)) == [8, 9, 10, 11, 12, 14, 15, 16, 17, 18]
+    assert not comp.is_within_resample_distance(13, 10)
+    assert comp.is_within_resample_distance(12, 10)
+
+
+def test_max_resample_distance_round_trip():
+    """Test max_resample_distance is serialized only when set."""
+    comp = make_composition(max_resample_distance=3)
+
+    assert "max_resample_distance" not in make_composition().to_dict()
+    assert LayerComposition.from_dict(comp.to_dict()).max_resample_distance == 3
+
+
+def test_signature_tracks_rendering_settings():
+    """Test signatures match for equal settings and differ when a setting changes."""
+    comp = make_composition(lod_mode="select_zooms", selected_zooms_mask=zooms_to_mask({12, 14}))
+
+    assert comp.signature() == comp.copy().signature()
+    hash(comp.signature())
+
+    changed = comp.copy()
+    changed.selected_zooms_mask |= 1 << 16
+    assert changed.signature() != comp.signature()
+    assert make_composition(opacity=50).signature() != make_composition().signature()
+
+
+def test_to_dict_omits_defaults():
+    """Test default settings serialize to the minimal form and others are kept."""
+    assert make_composition().to_dict() == {"name": "std", "opacity": 100, "blend_mode": "normal"}
+
+    comp = make_composition(
+        export_mode="separate", enabled=False, lod_mode="select_zooms", selected_zooms_mask=zooms_to_mask({14, 12})
+    )
+    assert comp.to_dict() == {
+        "name": "std",
+        "opacity": 100,
+        "blend_mode": "normal",
+        "export_mode": "separate",
+        "enabled": False,
+        "lod_mode": "select_zooms",
+        "selected_zooms": [12, 14],
+    }
+
+
+def test_zoom_mask_helpers():
+    """Test bitmask packing, iteration and the selected_zooms view."""
+    assert list(iter_zooms(zooms_to_mask({16, 2, 9}))) == [2, 9, 16]
+
+    comp = make_composition(lod_mode="select_zooms")
+    comp.selected_zooms = {0, 12, 20}
+
+    assert comp.selected_zooms == frozenset({0, 12, 20})
+    assert list(iter_zooms(comp.get_available_zooms())) == [12]  # std supports zoom 2-18
+    assert list(iter_zooms(make_composition().get_available_zooms())) == list(range(2, 19))
+
+
+def test_from_dict_many_preserves_order():
+    """Test bulk parsing accepts string and dict specs and keeps their order."""
+    comps = LayerComposition.from_dict_many(["std", {"name": "ort", "opacity": 50}])
+
+    assert [comp.layer_config.name for comp in comps] == ["std", "ort"]
+    assert comps[1].opacity == 50
+
+    with pytest.raises(ValueError):
+        LayerComposition.from_dict_many(["std", "not_a_layer"])
+
+
+def test_copy_is_independent():
+    """Test copies don't share selected zooms and instances have no __dict__."""
+    comp = make_composition(lod_mode="select_zooms", selected_zooms_mask=zooms_to_mask({12}))
+    clone = comp.copy()
+    clone.selected_zooms = {14}
+
+    assert comp.selected_zooms == frozenset({12})
+    assert not hasattr(comp, "__dict__")
@@ -0,0 +1,27 @@
+"""Tests for the LRU cache helper."""
+
+import pytest
+
+from src.utils.lru_cache import LRUCache
+
+
+def test_lru_cache_evicts_least_recently_used():
+    """Test a lookup refreshes an entry so the oldest untouched entry is evicted."""
+    cache: LRUCache[str, int] = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c"), len(cache)) == (1, 3, 2)
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_lru_cache_rejects_empty_size():
+    """Test a cache must hold at least one entry."""
+    with pytest.raises(ValueError):
+        LRUCache(0)
@@ -0,0 +1,19 @@
+"""Tests for multi-layer progress reporting."""
+
+from src.utils.progress import CombinedLayerProgress
+
+
+def test_combined_layer_progress_sums_layers():
+    """Test concurrent layers report one steadily increasing count."""
+    calls = []
+    progress = CombinedLayerProgress(lambda current, total, message: calls.append((current, total, message)), 3)
+    first = progress.layer_callback(0, "std")
+    second = progress.layer_callback(1, "ort")
+    progress.skip_layer(2)
+
+    first(1, 10, "Writing tile 1/10...")
+    second(4, 10, "Writing tile 4/10...")
+    first(2, 10, "Writing tile 2/10...")
+
+    assert [(current, total) for current, total, _ in calls] == [(1, 20), (5, 20), (6, 20)]
+    assert calls[-1][2] == "Layer 1/3 (std): Writing tile 2/10..."